@@ -0,0 +1,203 @@
+"""In-memory cache of loaded datasets and contour tables."""
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from pandas import DataFrame
+from xarray import Dataset
+
+from boilercv.data import FRAME
+from boilercv_pipeline import CACHE
+from boilercv_pipeline.manifest import walk_files
+
+CACHE_NBYTES = 2**30
+"""Default maximum size of cached values, in bytes."""
+
+Key = tuple[Hashable, ...]
+"""Key of a cached value."""
+
+
+@dataclass
+class CacheInfo:
+    """Statistics of a cache."""
+
+    hits: int
+    """Number of values served from the cache."""
+    misses: int
+    """Number of values not found in the cache."""
+    evictions: int
+    """Number of values evicted to keep the cache within its size."""
+    entries: int
+    """Number of cached values."""
+    nbytes: int
+    """Size of cached values, in bytes."""
+    max_nbytes: int
+    """Maximum size of cached values, in bytes."""
+
+
+@dataclass
+class DatasetCache:
+    """Cache of loaded datasets and contour tables, evicting the least-recently used.
+
+    Values are keyed on their source files, including the modification times of each
+    file in directories such as Zarr stores, and the parameters they were loaded with,
+    such as the stage and the slice of frames. A request for a slice of frames is
+    served from a cached value with all frames, if there is one.
+
+    Shallow copies of cached values are returned, so that callers may assign to them
+    without modifying the cache. Arrays of cached datasets are made read-only, so they
+    can't be modified in-place either, while dataframes are copied on write.
+
+    Caching is opt-in, e.g. by setting `BOILERCV_CACHE=true`, as each process gets its
+    own cache, such as each worker of a process pool.
+    """
+
+    max_nbytes: int = CACHE_NBYTES
+    """Maximum size of cached values, in bytes."""
+    enabled: bool = CACHE
+    """Whether to cache values. Otherwise, nothing is cached or served."""
+    entries: OrderedDict[Key, tuple[Any, int]] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    """Cached values and their sizes, from least- to most-recently used."""
+    nbytes: int = field(default=0, init=False)
+    """Size of cached values, in bytes."""
+    hits: int = field(default=0, init=False)
+    """Number of values served from the cache."""
+    misses: int = field(default=0, init=False)
+    """Number of values not found in the cache."""
+    evictions: int = field(default=0, init=False)
+    """Number of values evicted to keep the cache within its size."""
+    lock: Lock = field(default_factory=Lock, init=False, repr=False)
+    """Lock for access from multiple threads."""
+
+    def get_key(self, *paths: Path, **params: Hashable) -> Key | None:
+        """Get the key of a value as in `get_key`, or `None` if caching is disabled.
+
+        Keys of directories such as Zarr stores stat each of their files, so they are
+        only worth getting if values may be cached.
+
+        Args:
+            *paths: Files or directories the value was loaded from.
+            **params: Parameters the value was loaded with, such as the stage.
+        """
+        return get_key(*paths, **params) if self.enabled else None
+
+    def get(self, key: Key | None, frame: slice = slice(None)) -> Any | None:
+        """Get a copy of a cached value, or `None` if it isn't cached.
+
+        Args:
+            key: Key of the value. Nothing is served without a key.
+            frame: Slice of frames of the value. Served from the value with all frames
+                if only that is cached.
+        """
+        if not self.enabled or key is None:
+            return None
+        with self.lock:
+            value = self.touch((*key, get_slice_key(frame)))
+            if value is None and frame != slice(None):
+                value = self.touch((*key, get_slice_key(slice(None))))
+                value = None if value is None else value.sel({FRAME: frame})
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return value.copy(deep=False)
+
+    def put(self, key: Key | None, value: Any, frame: slice = slice(None)) -> Any:
+        """Cache a value and get a copy of it, evicting others to make room for it.
+
+        Args:
+            key: Key of the value. Nothing is cached without a key.
+            value: Dataset or dataframe.
+            frame: Slice of frames of the value.
+        """
+        if not self.enabled or key is None:
+            return value
+        nbytes = get_nbytes(value)
+        if nbytes > self.max_nbytes:
+            return value
+        with self.lock:
+            key = (*key, get_slice_key(frame))
+            if key in self.entries:
+                self.nbytes -= self.entries.pop(key)[1]
+            while self.entries and self.nbytes + nbytes > self.max_nbytes:
+                self.nbytes -= self.entries.popitem(last=False)[1][1]
+                self.evictions += 1
+            self.entries[key] = (freeze(value), nbytes)
+            self.nbytes += nbytes
+        return value.copy(deep=False)
+
+    def touch(self, key: Key) -> Any | None:
+        """Get a cached value, marking it as most-recently used."""
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key][0]
+
+    def clear(self):
+        """Clear cached values and statistics."""
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        """Get statistics of the cache."""
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self.entries),
+            nbytes=self.nbytes,
+            max_nbytes=self.max_nbytes,
+        )
+
+
+def freeze(value: Any) -> Any:
+    """Make the arrays of a loaded dataset read-only, so views can't modify them.
+
+    Dataframes are left as they are, as they are copied on write.
+    """
+    if isinstance(value, Dataset):
+        for variable in value.variables.values():
+            variable.values.flags.writeable = False
+    return value
+
+
+def get_key(*paths: Path, **params: Hashable) -> Key:
+    """Get the key of a value loaded from files or directories with parameters.
+
+    Includes the size and modification time of each file, including files within
+    directories such as Zarr stores, so values loaded from files which have since
+    changed are not served.
+
+    Args:
+        *paths: Files or directories the value was loaded from.
+        **params: Parameters the value was loaded with, such as the stage.
+    """
+    return (*(get_path_key(path) for path in paths), *sorted(params.items()))
+
+
+def get_path_key(path: Path) -> Key:
+    """Get the key of a file, or of each file in a directory such as a Zarr store."""
+    files: list[Key] = []
+    for file in walk_files(path):
+        stat = file.stat()
+        files.append((file.relative_to(path), stat.st_size, stat.st_mtime_ns))
+    return (path.resolve(), *files)
+
+
+def get_slice_key(frame: slice) -> Key:
+    """Get a hashable key for a slice of frames."""
+    return (frame.start, frame.stop, frame.step)
+
+
+def get_nbytes(value: Any) -> int:
+    """Get the size of a dataset or dataframe in bytes, counting lazy data as loaded."""
+    if isinstance(value, DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    return value.nbytes
@@ -1,42 +1,163 @@
 """Image and video capturing."""
 
+from collections.abc import Iterable, Iterator
+from contextlib import closing
 from pathlib import Path
+from queue import Empty, Queue
+from threading import Event, Thread
 from warnings import warn
 
 import imageio
-from numpy import integer, issubdtype
+from imageio_ffmpeg import write_frames
+from numpy import ascontiguousarray, integer, issubdtype
 
+from boilercv.data import CHUNK_FRAMES, get_frame_chunks
 from boilercv.images import scale_bool
 from boilercv.types import DA, Img, ImgBool, Vid, VidBool
 from boilercv_pipeline.captivate import FFMPEG_LOG_LEVEL, FRAMERATE_CONT
 
+QUEUE_FRAMES = 16
+"""Default number of frames converted ahead of the encoder."""
+QUALITY = None
+"""Quality of the encoder if no constant rate factor is given.
+
+The `imageio` writer documents a default quality of 5, but passes none to FFMPEG, so
+the encoder chooses its own constant rate factor. Match it to write identical videos.
+"""
+PIX_FMTS = {1: "gray", 2: "gray8a", 3: "rgb24", 4: "rgba"}
+"""Raw pixel formats of frames fed to FFMPEG, by number of channels."""
+
 
 def write_video(
     path: Path,
-    video: Vid | VidBool | DA,
+    video: Vid | VidBool | DA | Iterable[Img | ImgBool],
     framerate: int = FRAMERATE_CONT,
     preview_frame: bool = False,
+    crf: int | None = None,
+    preset: str | None = None,
+    tune: str | None = None,
+    threads: int | None = None,
+    queue_frames: int = QUEUE_FRAMES,
 ):
     """Write a video to disk with the default filetype and timestamp.
 
+    Frames are converted in a background thread and streamed to FFMPEG as raw frames
+    through a pipe, so only a few frames are in memory at once. Data arrays are read
+    in chunks of frames, so lazily-loaded videos are never loaded in full.
+
     Args:
         path: Path to the video file (suffix coerced to '.mp4').
-        video: Data structure to write as a video.
+        video: Data structure to write as a video, or an iterable of its frames.
         framerate: Frames per second. Default: Package default framerate.
         preview_frame: Write the first frame to disk as an image. Default: False.
+        crf: Constant rate factor of the encoder, lower for higher quality. Default:
+            Chosen by the encoder, as by the `imageio` writer.
+        preset: Encoder preset trading speed for compression, e.g. "veryfast".
+        tune: Encoder tuning for the content, e.g. "grain" or "stillimage".
+        threads: Number of encoder threads. Default: Chosen by the encoder.
+        queue_frames: Number of frames converted ahead of the encoder.
     """
-    video = coerce_input(video)
     if path.suffix and path.suffix != ".mp4":
         warn(f"Changing extesion of {path}  to '.mp4'.", stacklevel=2)
     path = path.with_suffix(".mp4")
-    writer = imageio.get_writer(
-        uri=path, fps=framerate, macro_block_size=8, ffmpeg_log_level=FFMPEG_LOG_LEVEL
-    )
-    for image in video:
-        writer.append_data(image)
-    writer.close()
+    with closing(iter_frames_ahead(video, queue_frames)) as frames:
+        first_frame = next(frames, None)
+        if first_frame is None:
+            raise ValueError(f"Cannot write {path} without frames.")
+        height, width = first_frame.shape[:2]
+        writer = write_frames(
+            path,
+            size=(width, height),
+            pix_fmt_in=PIX_FMTS[first_frame.shape[2] if first_frame.ndim == 3 else 1],
+            fps=framerate,
+            quality=QUALITY if crf is None else None,
+            macro_block_size=8,
+            ffmpeg_log_level=FFMPEG_LOG_LEVEL,
+            output_params=get_encoder_params(crf, preset, tune, threads),
+        )
+        writer.send(None)
+        try:
+            writer.send(first_frame)
+            for frame in frames:
+                writer.send(frame)
+        finally:
+            writer.close()
     if preview_frame:
-        write_image(path.with_suffix(".png"), video[0])
+        write_image(path.with_suffix(".png"), first_frame)
+
+
+def get_encoder_params(
+    crf: int | None = None,
+    preset: str | None = None,
+    tune: str | None = None,
+    threads: int | None = None,
+) -> list[str]:
+    """Get FFMPEG output parameters for encoder options that are given."""
+    options = {"crf": crf, "preset": preset, "tune": tune, "threads": threads}
+    params: list[str] = []
+    for option, value in options.items():
+        if value is not None:
+            params.extend([f"-{option}", str(value)])
+    return params
+
+
+def iter_frames_ahead(
+    video: Vid | VidBool | DA | Iterable[Img | ImgBool],
+    queue_frames: int = QUEUE_FRAMES,
+) -> Iterator[Img]:
+    """Iterate over viewable frames of a video, converted ahead in a background thread.
+
+    Args:
+        video: Video, or an iterable of its frames.
+        queue_frames: Maximum number of frames converted ahead of iteration.
+    """
+    queue: Queue[Img | BaseException | None] = Queue(maxsize=queue_frames)
+    stop = Event()
+
+    def produce():
+        try:
+            for frame in iter_frames(video):
+                if stop.is_set():
+                    return
+                queue.put(frame)
+            queue.put(None)
+        except BaseException as exc:  # noqa: BLE001
+            queue.put(exc)
+
+    producer = Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while (frame := queue.get()) is not None:
+            if isinstance(frame, BaseException):
+                raise frame
+            yield frame
+    finally:
+        # Take frames until the producer stops, in case it is blocked on a full queue
+        stop.set()
+        while producer.is_alive():
+            try:
+                queue.get(timeout=0.1)
+            except Empty:
+                continue
+        producer.join()
+
+
+def iter_frames(
+    video: Vid | VidBool | DA | Iterable[Img | ImgBool],
+    chunk_frames: int = CHUNK_FRAMES,
+) -> Iterator[Img]:
+    """Iterate over the frames of a video, coerced to contiguous viewable frames.
+
+    Args:
+        video: Video, or an iterable of its frames.
+        chunk_frames: Number of frames of a data array to load at once.
+    """
+    if isinstance(video, DA):
+        for chunk in get_frame_chunks(video.shape[0], chunk_frames):
+            yield from iter_frames(coerce_input(video[chunk]))
+        return
+    for frame in video:
+        yield ascontiguousarray(coerce_input(frame))
 
 
 def write_image(path: Path, image: Img | ImgBool | DA):
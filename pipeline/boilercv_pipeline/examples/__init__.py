@@ -1,23 +1,40 @@
 """Examples, experiments, and demonstrations."""
 
+from functools import cache
+from typing import Any
+
 from xarray import open_dataset
 
 from boilercv.data import VIDEO
-from boilercv.types import DA
-from boilercv_pipeline.models.params import PARAMS
+from boilercv.types import DA, Img
+from boilercv_pipeline.models.params import get_params
 
 EXAMPLE_NUM_FRAMES = 500
 EXAMPLE_VIDEO_NAME = "2022-11-30T13-41-00"
-EXAMPLE_CONTOURS = PARAMS.paths.examples / f"{EXAMPLE_VIDEO_NAME}.h5"
-# TODO: Source the ROI from the dataset.
-EXAMPLE_ROI = PARAMS.paths.examples / f"{EXAMPLE_VIDEO_NAME}_roi.yaml"
 
 
+@cache
 def get_images() -> DA:
     """Get images."""
-    with open_dataset(PARAMS.paths.examples / f"{EXAMPLE_VIDEO_NAME}.nc") as ds:
+    with open_dataset(get_params().paths.examples / f"{EXAMPLE_VIDEO_NAME}.nc") as ds:
         return ds[VIDEO].sel(frame=slice(None, EXAMPLE_NUM_FRAMES))
 
 
-EXAMPLE_VIDEO = get_images()
-EXAMPLE_FRAME_LIST = list(EXAMPLE_VIDEO.values)
+@cache
+def get_frame_list() -> list[Img]:
+    """Get a list of images."""
+    return list(get_images().values)
+
+
+def __getattr__(name: str) -> Any:
+    """Get example paths and images on first access, rather than on import."""
+    if name == "EXAMPLE_CONTOURS":
+        return get_params().paths.examples / f"{EXAMPLE_VIDEO_NAME}.h5"
+    if name == "EXAMPLE_ROI":
+        # TODO: Source the ROI from the dataset.
+        return get_params().paths.examples / f"{EXAMPLE_VIDEO_NAME}_roi.yaml"
+    if name == "EXAMPLE_VIDEO":
+        return get_images()
+    if name == "EXAMPLE_FRAME_LIST":
+        return get_frame_list()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,9 +5,9 @@ from numpy import empty, uint8
 from pandas import DataFrame
 from xarray import zeros_like
 
-from boilercv.data import VIDEO
+from boilercv.data import FRAME, VIDEO
+from boilercv.data.contours import Contours
 from boilercv.images.cv import draw_contours
-from boilercv.types import ArrInt
 from boilercv_pipeline import PREVIEW
 from boilercv_pipeline.captivate.previews import view_images
 from boilercv_pipeline.examples import EXAMPLE_NUM_FRAMES, EXAMPLE_VIDEO_NAME
@@ -26,12 +26,9 @@ def main():  # noqa: D103
         df = get_contours_df(EXAMPLE_VIDEO_NAME)
     ds = zeros_like(get_dataset(EXAMPLE_VIDEO_NAME, EXAMPLE_NUM_FRAMES), dtype=uint8)
     video = ds[VIDEO]
-    if not df.empty:
-        for frame_num, frame in enumerate(video):
-            contours: list[ArrInt] = list(  # type: ignore  # pyright 1.1.333
-                df.loc[frame_num, :].groupby("contour").apply(lambda grp: grp.values)  # type: ignore  # pyright 1.1.333
-            )
-            video[frame_num, :, :] = draw_contours(frame.values, contours)
+    contours = Contours.from_df(df, num_frames=video.sizes[FRAME])
+    for frame_num, frame in enumerate(video):
+        video[frame_num, :, :] = draw_contours(frame.values, contours[frame_num])
     if PREVIEW:
         view_images(video)
 
@@ -0,0 +1,138 @@
+"""Manifests of the inputs to processed datasets, to reprocess only stale datasets."""
+
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from hashlib import file_digest, sha256
+from importlib.util import find_spec
+from json import dumps, loads
+from pathlib import Path
+from typing import Any
+
+from boilercv_pipeline.models.paths import atomic_write
+
+MANIFEST = ".manifest.json"
+"""Name of the manifest in a directory of processed datasets."""
+
+Fingerprint = dict[str, int | str]
+"""Size, modification time, and content hash of an input."""
+
+
+@dataclass
+class Manifest:
+    """Manifest of the inputs to each dataset in a directory of processed datasets.
+
+    Records content hashes of the input files of each processed dataset, as well as
+    hashes of the stage parameters and code. A dataset is stale if any of these differ
+    from those recorded when it was processed, or if it was never recorded. Content
+    hashes of inputs are reused while their sizes and modification times are unchanged,
+    so checking for stale datasets doesn't read every input each time.
+    """
+
+    directory: Path
+    """Directory of processed datasets."""
+    inputs: Callable[[str], Mapping[str, Path]] = lambda _name: {}
+    """Get the input files or directories of a dataset, by name, given its name."""
+    params: Mapping[str, Any] = field(default_factory=dict)
+    """Stage parameters which affect the processed datasets."""
+    code: Sequence[Path] = ()
+    """Stage code which affects the processed datasets."""
+    records: dict[str, dict[str, Any]] = field(init=False, repr=False)
+    """Recorded inputs of each processed dataset."""
+
+    def __post_init__(self):
+        path = self.directory / MANIFEST
+        self.records = loads(path.read_text("utf-8")) if path.exists() else {}
+
+    def is_stale(self, name: str) -> bool:
+        """Check whether a dataset must be reprocessed because its inputs changed."""
+        record = self.records.get(name)
+        return record is None or hash_record(record) != hash_record(self.get(name))
+
+    def record(self, name: str):
+        """Record the current inputs of a dataset after processing it."""
+        self.records[name] = self.get(name)
+        self.save()
+
+    def seed(self, names: Iterable[str]):
+        """Record the current inputs of datasets processed before they had manifests.
+
+        Datasets which were processed but never recorded are otherwise stale, so would
+        all be reprocessed once when manifests are introduced. Seeding assumes they are
+        current instead, as checking whether they exist did before, and only costs
+        hashing their inputs once.
+
+        Args:
+            names: Names of processed datasets. Those already recorded are kept.
+        """
+        if names := [name for name in names if name not in self.records]:
+            for name in names:
+                self.records[name] = self.get(name)
+            self.save()
+
+    def save(self):
+        """Write the manifest to its directory."""
+        with atomic_write(self.directory / MANIFEST) as temp:
+            temp.write_text(dumps(self.records, indent=2, sort_keys=True), "utf-8")
+
+    def get(self, name: str) -> dict[str, Any]:
+        """Get the current inputs of a dataset, reusing recorded hashes if unchanged."""
+        recorded_inputs = self.records.get(name, {}).get("inputs", {})
+        return {
+            "inputs": {
+                role: get_fingerprint(path, recorded_inputs.get(role))
+                for role, path in self.inputs(name).items()
+            },
+            "params": sha256(dumps(self.params, sort_keys=True).encode()).hexdigest(),
+            "code": hash_files(self.code),
+        }
+
+
+def hash_record(record: dict[str, Any]) -> tuple[Any, ...]:
+    """Get the parts of a record that determine whether its dataset is stale."""
+    return (
+        {role: fingerprint["hash"] for role, fingerprint in record["inputs"].items()},
+        record["params"],
+        record["code"],
+    )
+
+
+def get_fingerprint(path: Path, recorded: Fingerprint | None = None) -> Fingerprint:
+    """Get the fingerprint of an input, reusing its recorded hash if it is unchanged.
+
+    Args:
+        path: Input file, or directory such as a Zarr store.
+        recorded: Previously-recorded fingerprint of the input.
+    """
+    files = list(walk_files(path))
+    size = sum(file.stat().st_size for file in files)
+    mtime = max((file.stat().st_mtime_ns for file in files), default=0)
+    if recorded and (recorded["size"], recorded["mtime"]) == (size, mtime):
+        return recorded
+    return {"size": size, "mtime": mtime, "hash": hash_files(files)}
+
+
+def hash_files(paths: Sequence[Path]) -> str:
+    """Hash the contents of files, or of all files in directories, in order."""
+    digest = sha256()
+    for path in paths:
+        for file in walk_files(path):
+            with file.open("rb") as f:
+                digest.update(file_digest(f, "sha256").digest())
+    return digest.hexdigest()
+
+
+def get_module_paths(*modules: str) -> list[Path]:
+    """Get the source files of modules without importing them, e.g. as stage code.
+
+    Args:
+        modules: Fully-qualified module names.
+    """
+    return [Path(find_spec(module).origin) for module in modules]  # type: ignore
+
+
+def walk_files(path: Path) -> Iterator[Path]:
+    """Walk the files of a directory in sorted order, or yield a file if it exists."""
+    if path.is_dir():
+        yield from sorted(p for p in path.rglob("*") if p.is_file())
+    elif path.exists():
+        yield path
@@ -0,0 +1,72 @@
+"""Benchmark reading and writing a video dataset with each storage codec."""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import get_args
+
+from cyclopts import App
+from loguru import logger
+from pandas import DataFrame
+from xarray import open_dataset
+
+from boilercv.data import CHUNK_FRAMES, VIDEO
+from boilercv.data.packing import unpack
+from boilercv.types import DS
+from boilercv_pipeline.models.params import PARAMS
+from boilercv_pipeline.models.paths import get_sorted_paths
+from boilercv_pipeline.storage import get_encoding
+from boilercv_pipeline.types import Codec
+
+APP = App()
+"""CLI."""
+
+
+@APP.default
+def main(source: Path | None = None, chunk_frames: int = CHUNK_FRAMES, repeat: int = 3):
+    """Benchmark reading and writing a video dataset with each storage codec.
+
+    Args:
+        source: Bit-packed video dataset. Default: The first source.
+        chunk_frames: Number of frames in each compressed chunk.
+        repeat: Number of times to repeat each measurement, keeping the fastest.
+    """
+    source = source or get_sorted_paths(PARAMS.paths.sources)[0]
+    with open_dataset(source) as ds:
+        ds = ds.load()
+    results: dict[Codec, dict[str, float]] = {}
+    with TemporaryDirectory() as tmp:
+        for codec in get_args(Codec):
+            destination = Path(tmp) / f"{codec}.nc"
+            results[codec] = benchmark_codec(
+                ds, destination, codec, chunk_frames, repeat
+            )
+    logger.info(f"Benchmark of {source.name}:\n{DataFrame(results).T}")
+
+
+def benchmark_codec(
+    ds: DS, destination: Path, codec: Codec, chunk_frames: int, repeat: int
+) -> dict[str, float]:
+    """Get the size, write time, and time to read and unpack a dataset with a codec."""
+    encoding = {VIDEO: get_encoding(ds[VIDEO], codec, chunk_frames)}
+    write_times: list[float] = []
+    read_times: list[float] = []
+    for _ in range(repeat):
+        start = perf_counter()
+        ds.to_netcdf(path=destination, encoding=encoding)
+        write_times.append(perf_counter() - start)
+        start = perf_counter()
+        with open_dataset(destination) as written:
+            unpack(written[VIDEO]).load()
+        read_times.append(perf_counter() - start)
+    packed_size = ds[VIDEO].nbytes / 2**20
+    return {
+        "size (MB)": destination.stat().st_size / 2**20,
+        "write (s)": min(write_times),
+        "read (s)": min(read_times),
+        "read (MB/s)": packed_size / min(read_times),
+    }
+
+
+if __name__ == "__main__":
+    APP()
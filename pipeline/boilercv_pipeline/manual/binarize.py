@@ -1,43 +1,81 @@
 """Binarize all videos and export their ROIs."""
 
+from pathlib import Path
+
+from dask import config as dask_config
 from loguru import logger
+from numpy import stack
 from tqdm import tqdm
 from xarray import open_dataset
 
-from boilercv.data import FRAME, ROI, VIDEO, apply_to_img_da
-from boilercv.data.packing import pack
+from boilercv.data import CHUNK_FRAMES, FRAME, ROI, VIDEO, apply_to_img_da
+from boilercv.data.packing import pack_with
 from boilercv.images import scale_bool
-from boilercv.images.cv import apply_mask, binarize, close_and_erode, flood
-from boilercv.types import DA
+from boilercv.images.cv import apply_mask, binarize_and_pack, close_and_erode, flood
+from boilercv.types import DA, Img, Vid
 from boilercv_pipeline.models.params import PARAMS
-from boilercv_pipeline.models.paths import get_sorted_paths
+from boilercv_pipeline.models.paths import atomic_write, get_sorted_paths
+from boilercv_pipeline.storage import CODEC, get_encoding, to_netcdf
+from boilercv_pipeline.types import Codec
 
 
-def main():  # noqa: D103
+def main(chunk_frames: int = CHUNK_FRAMES, codec: Codec = CODEC):  # noqa: D103
     logger.info("start binarize")
     for source in tqdm(get_sorted_paths(PARAMS.paths.large_sources)):
         destination = PARAMS.paths.sources / f"{source.stem}.nc"
         if destination.exists():
             continue
-        with open_dataset(source) as ds:
-            video = ds[VIDEO]
-            maximum = video.max(FRAME)
-            flooded: DA = apply_to_img_da(flood, maximum)
-            roi: DA = apply_to_img_da(close_and_erode, scale_bool(flooded))
-            masked: DA = apply_to_img_da(
-                apply_mask, video, scale_bool(roi), vectorize=True
-            )
-            binarized: DA = apply_to_img_da(binarize, masked, vectorize=True)
-            ds[VIDEO] = pack(binarized)
-            ds.to_netcdf(
-                path=PARAMS.paths.sources / source.name,
-                encoding={VIDEO: {"zlib": True}},
-            )
-            ds[ROI] = roi
-            ds = ds.drop_vars(VIDEO)
-            ds.to_netcdf(path=PARAMS.paths.rois / source.name)
+        binarize_dataset(
+            source, destination, PARAMS.paths.rois / source.name, chunk_frames, codec
+        )
     logger.info("finish binarize")
 
 
+def binarize_dataset(
+    source: Path,
+    destination: Path,
+    roi_destination: Path,
+    chunk_frames: int,
+    codec: Codec = CODEC,
+):
+    """Binarize a large grayscale video out-of-core, holding a chunk of frames at once.
+
+    The first pass streams frames to get the maximum over all frames, from which the
+    ROI is found and written. The second pass streams chunks of frames through masking,
+    binarization, and bit-packing, writing each chunk to the destination in turn.
+
+    Args:
+        source: Grayscale video dataset.
+        destination: Destination for the binarized and bit-packed video dataset.
+        roi_destination: Destination for the ROI dataset.
+        chunk_frames: Number of frames to process at once.
+        codec: Compression codec for the binarized video.
+    """
+    with (
+        open_dataset(source, chunks={FRAME: chunk_frames}) as ds,
+        # Only compute one chunk at a time so that memory use doesn't scale with cores
+        dask_config.set(scheduler="synchronous"),
+    ):
+        video = ds[VIDEO]
+        maximum = video.max(FRAME).compute()
+        flooded: DA = apply_to_img_da(flood, maximum)
+        roi: DA = apply_to_img_da(close_and_erode, scale_bool(flooded))
+        ds[ROI] = roi
+        ds.drop_vars(VIDEO).to_netcdf(path=roi_destination)
+        ds = ds.drop_vars(ROI)
+        ds[VIDEO] = pack_with(
+            binarize_chunk, video, kwargs=dict(mask=scale_bool(roi.values))
+        )
+        with atomic_write(destination) as temp:
+            to_netcdf(
+                ds, temp, encoding={VIDEO: get_encoding(ds[VIDEO], codec, chunk_frames)}
+            )
+
+
+def binarize_chunk(video: Vid, mask: Img) -> Vid:
+    """Mask, binarize, and bit-pack a chunk of frames."""
+    return binarize_and_pack(stack([apply_mask(img, mask) for img in video]))
+
+
 if __name__ == "__main__":
     main()
@@ -1,37 +1,66 @@
 """Convert all CINEs to NetCDF."""
 
-import contextlib
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+from boilercine import get_cine_images
+from cyclopts import App
 from loguru import logger
 from tqdm import tqdm
 
 from boilercv_pipeline.models.params import PARAMS
-from boilercv_pipeline.models.paths import get_sorted_paths
-from boilercv_pipeline.video import prepare_dataset
+from boilercv_pipeline.models.paths import atomic_write, get_sorted_paths
+from boilercv_pipeline.sets import get_cine_name
+from boilercv_pipeline.video import write_dataset
 
+MEMORY_BUDGET = 1024
+"""Memory budget for converting each CINE, in megabytes."""
 
-def main():  # noqa: D103
+APP = App()
+"""CLI."""
+
+
+@APP.default
+def main(workers: int | None = None, memory_budget: int = MEMORY_BUDGET):
+    """Convert all CINEs to NetCDF in parallel.
+
+    Args:
+        workers: Number of CINEs to convert at once. Default: Number of processors.
+        memory_budget: Memory budget for converting each CINE, in megabytes.
+    """
     logger.info("start convert")
-    for source in tqdm(get_sorted_paths(PARAMS.paths.cines)):
-        if dt := get_datetime_from_cine(source):
-            destination_stem = dt.isoformat().replace(":", "-")
-        else:
-            destination_stem = source.stem
-        destination = PARAMS.paths.large_sources / f"{destination_stem}.nc"
+    destinations: dict[Path, Path] = {}
+    for source in get_sorted_paths(PARAMS.paths.cines):
+        destination = PARAMS.paths.large_sources / f"{get_cine_name(source)}.nc"
         if destination.exists():
             continue
-        prepare_dataset(source).to_netcdf(path=destination)
+        destinations[source] = destination
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for future in tqdm(
+            as_completed(
+                executor.submit(convert, source, destination, memory_budget)
+                for source, destination in destinations.items()
+            ),
+            total=len(destinations),
+        ):
+            future.result()
     logger.info("finish convert")
 
 
-def get_datetime_from_cine(path: Path) -> datetime | None:
-    """Get datetime from a cine named by Phantom Cine Viewer's {timeS} scheme."""
-    with contextlib.suppress(ValueError):
-        return datetime.strptime(path.stem, r"Y%Y%m%dH%H%M%S")
-    return None
+def convert(source: Path, destination: Path, memory_budget: int = MEMORY_BUDGET):
+    """Convert a CINE to NetCDF within a memory budget, writing atomically.
+
+    Args:
+        source: CINE to convert.
+        destination: NetCDF file to write.
+        memory_budget: Memory budget for the conversion, in megabytes.
+    """
+    frame_bytes = next(get_cine_images(source, 1)).nbytes
+    # Budget for a chunk read from the CINE and its copy on the way to disk
+    chunk_frames = max(1, memory_budget * 2**20 // (2 * frame_bytes))
+    with atomic_write(destination) as temp:
+        write_dataset(source, temp, chunk_frames=chunk_frames)
 
 
 if __name__ == "__main__":
-    main()
+    APP()
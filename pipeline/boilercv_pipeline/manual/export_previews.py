@@ -0,0 +1,219 @@
+"""Export a preview video of each trial."""
+
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from cyclopts import App
+from loguru import logger
+from numpy import asarray, ascontiguousarray
+from tqdm import tqdm
+
+from boilercv.colors import BLUE, RED
+from boilercv.data import CHUNK_FRAMES, FRAME, VIDEO, get_frame_chunks
+from boilercv.data.contours import Contours
+from boilercv.images import overlay_video, scale_bool
+from boilercv.images.cv import draw_frame_contours
+from boilercv.types import DA, Img
+from boilercv_pipeline.captivate.captures import write_video
+from boilercv_pipeline.manifest import walk_files
+from boilercv_pipeline.models.params import PARAMS
+from boilercv_pipeline.sets import (
+    get_all_stems,
+    get_contours,
+    get_contours_source,
+    get_dataset,
+    get_stage,
+)
+
+ENCODER_THREADS = 1
+"""Default number of encoder threads for each trial, as trials are encoded at once."""
+CONTOUR_THICKNESS = 2
+"""Thickness of contour outlines."""
+
+APP = App()
+"""CLI."""
+
+
+@APP.default
+def main(
+    workers: int | None = None,
+    num_frames: int = 0,
+    preview_frame: bool = True,
+    crf: int | None = None,
+    preset: str | None = None,
+    threads: int | None = ENCODER_THREADS,
+):
+    """Export a preview video of each trial in parallel, skipping up-to-date previews.
+
+    Previews show filled bubbles and contour outlines over the grayscale video of each
+    trial, or over the binarized video if its grayscale video isn't available. Trials
+    are skipped if their preview is newer than their inputs, or if their bubbles have
+    not yet been filled or their contours found.
+
+    Args:
+        workers: Number of trials to export at once. Default: Number of processors.
+        num_frames: Number of frames in each preview. Default: All frames.
+        preview_frame: Also export the first frame of each preview as an image.
+        crf: Constant rate factor of the encoder. Default: Chosen by the encoder.
+        preset: Encoder preset trading speed for compression, e.g. "veryfast".
+        threads: Number of encoder threads for each trial.
+    """
+    logger.info("start export previews")
+    destination_dir = PARAMS.paths.media / "trials"
+    destination_dir.mkdir(parents=True, exist_ok=True)
+    destinations: dict[str, Path] = {}
+    for name in get_all_stems():
+        destination = destination_dir / f"{name}.mp4"
+        inputs = get_trial_inputs(name)
+        if not all(path.exists() for path in inputs.values()) or is_up_to_date(
+            destination, inputs.values(), preview_frame
+        ):
+            continue
+        destinations[name] = destination
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for future in tqdm(
+            as_completed(
+                executor.submit(
+                    export_trial,
+                    name,
+                    destination,
+                    num_frames,
+                    preview_frame,
+                    crf,
+                    preset,
+                    threads,
+                )
+                for name, destination in destinations.items()
+            ),
+            total=len(destinations),
+        ):
+            future.result()
+    logger.info("finish export previews")
+
+
+def get_trial_inputs(name: str) -> dict[str, Path]:
+    """Get the inputs to the preview of a trial.
+
+    Args:
+        name: Name of the trial.
+    """
+    large_source, _ = get_stage(name, "large_sources")
+    return {
+        "gray": large_source if large_source.exists() else get_stage(name)[0],
+        "filled": get_stage(name, "filled")[0],
+        "contours": get_contours_source(name),
+    }
+
+
+def is_up_to_date(
+    destination: Path, inputs: Iterable[Path], preview_frame: bool = True
+) -> bool:
+    """Check whether a preview exists and is newer than each of its inputs.
+
+    Args:
+        destination: Preview video.
+        inputs: Input files, or directories such as Zarr stores.
+        preview_frame: Whether the first frame should also have been exported.
+    """
+    if not destination.exists() or (
+        preview_frame and not destination.with_suffix(".png").exists()
+    ):
+        return False
+    mtime = destination.stat().st_mtime_ns
+    return all(
+        file.stat().st_mtime_ns <= mtime for path in inputs for file in walk_files(path)
+    )
+
+
+def export_trial(
+    name: str,
+    destination: Path,
+    num_frames: int = 0,
+    preview_frame: bool = True,
+    crf: int | None = None,
+    preset: str | None = None,
+    threads: int | None = ENCODER_THREADS,
+):
+    """Export the preview video of a trial, writing atomically.
+
+    Args:
+        name: Name of the trial.
+        destination: Preview video.
+        num_frames: Number of frames in the preview. Default: All frames.
+        preview_frame: Also export the first frame of the preview as an image.
+        crf: Constant rate factor of the encoder. Default: Chosen by the encoder.
+        preset: Encoder preset trading speed for compression, e.g. "veryfast".
+        threads: Number of encoder threads.
+    """
+    filled = get_dataset(name, num_frames, stage="filled", lazy=True)[VIDEO]
+    frames = compose_trial(
+        get_gray_video(name, num_frames),
+        filled,
+        get_contours(name, num_frames=filled.sizes[FRAME]),
+    )
+    # Write hidden files with the usual extensions, then move them into place
+    temp = destination.with_name(f".{destination.name}")
+    try:
+        write_video(
+            temp,
+            frames,
+            preview_frame=preview_frame,
+            crf=crf,
+            preset=preset,
+            threads=threads,
+        )
+        if preview_frame:
+            temp.with_suffix(".png").replace(destination.with_suffix(".png"))
+        temp.replace(destination)
+    finally:
+        temp.unlink(missing_ok=True)
+        temp.with_suffix(".png").unlink(missing_ok=True)
+
+
+def get_gray_video(name: str, num_frames: int = 0) -> DA:
+    """Lazily get the grayscale video of a trial, or its binarized video if unavailable.
+
+    Args:
+        name: Name of the trial.
+        num_frames: Number of frames to get. Default: All frames.
+    """
+    gray = get_dataset(name, num_frames, stage="large_sources", lazy=True)
+    if VIDEO in gray:
+        return gray[VIDEO]
+    return get_dataset(name, num_frames, lazy=True)[VIDEO]
+
+
+def compose_trial(
+    gray: DA, filled: DA, contours: Contours, chunk_frames: int = CHUNK_FRAMES
+) -> Iterator[Img]:
+    """Compose frames with filled bubbles and contour outlines over the video.
+
+    Frames are loaded and composed in chunks, so lazily-loaded videos are never loaded
+    in full. Frames of the filled video are composed, selecting the same frames of the
+    video and contours by frame number.
+
+    Args:
+        gray: Grayscale or binarized video.
+        filled: Video of filled bubbles.
+        contours: Contours of each frame of the video, numbered from its first frame.
+        chunk_frames: Number of frames to compose at once.
+    """
+    for chunk in get_frame_chunks(filled.sizes[FRAME], chunk_frames):
+        frames = filled[FRAME][chunk]
+        composed = overlay_video(
+            asarray(gray.sel({FRAME: frames})),
+            scale_bool(asarray(filled[chunk])),
+            color=RED,
+        )
+        for frame, image in zip(frames.values, composed, strict=True):
+            yield draw_frame_contours(
+                ascontiguousarray(image),
+                *contours.get_frame_vertices(frame),
+                thickness=CONTOUR_THICKNESS,
+                color=BLUE,
+            )
+
+
+if __name__ == "__main__":
+    APP()
@@ -1,6 +1,8 @@
 """Project parameters."""
 
+from functools import cache
 from pathlib import Path
+from typing import Any
 
 from boilercore.models import SynchronizedPathsYamlModel
 from pydantic.v1 import Field
@@ -19,5 +21,18 @@ class Params(SynchronizedPathsYamlModel):
         super().__init__(data_file, **kwargs)
 
 
-PARAMS = Params()
-"""All project parameters, including paths."""
+@cache
+def get_params() -> Params:
+    """Get all project parameters, including paths.
+
+    Parameters are synchronized with the parameters file on first access, rather than
+    on import, so modules which only need them in functions are cheap to import.
+    """
+    return Params()
+
+
+def __getattr__(name: str) -> Any:
+    """Get all project parameters as `PARAMS` on first access."""
+    if name == "PARAMS":
+        return get_params()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,7 @@
 """Project paths."""
 
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 from boilercore.models import CreatePathsModel
@@ -11,8 +13,23 @@ from boilercv_pipeline import PROJECT_PATH
 
 
 def get_sorted_paths(path: Path) -> list[Path]:
-    """Iterate over a sorted directory."""
-    return sorted(path.iterdir())
+    """Iterate over a sorted directory, skipping hidden files."""
+    return sorted(p for p in path.iterdir() if not p.name.startswith("."))
+
+
+@contextmanager
+def atomic_write(destination: Path) -> Iterator[Path]:
+    """Yield a temporary path to write to, then move it to the destination.
+
+    The temporary file is hidden, and is only moved to the destination after writing
+    finishes, so an interrupted write never leaves a partial file at the destination.
+    """
+    temp = destination.with_name(f".{destination.name}.tmp")
+    try:
+        yield temp
+        temp.replace(destination)
+    finally:
+        temp.unlink(missing_ok=True)
 
 
 class Paths(CreatePathsModel):
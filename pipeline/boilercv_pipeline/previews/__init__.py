@@ -6,7 +6,7 @@ from xarray import Dataset, apply_ufunc, open_dataset
 
 from boilercv.colors import RED
 from boilercv.data import VIDEO, YX_PX, identity_da
-from boilercv.images import draw_text, overlay
+from boilercv.images import draw_text_video, overlay_video
 from boilercv.types import DA, DS
 from boilercv_pipeline import DEBUG
 from boilercv_pipeline.sets import slice_frames
@@ -25,31 +25,21 @@ def get_preview(path: Path) -> DS:
 
 
 def draw_text_da(da: DA) -> DA:
-    """Draw text on images in a data array."""
+    """Draw the frame coordinate in the corner of each frame in a data array."""
     frames_dim = str(da.dims[0])
-    if da.ndim == 4:
-        # We have a color video
-        return apply_ufunc(
-            draw_text,
-            da,
-            identity_da(da, frames_dim),
-            input_core_dims=([*YX_PX, "channel"], []),
-            output_core_dims=([*YX_PX, "channel"],),
-            vectorize=True,
-        )
-    else:
-        return apply_ufunc(
-            draw_text,
-            da,
-            identity_da(da, frames_dim),
-            input_core_dims=(YX_PX, []),
-            output_core_dims=(YX_PX,),
-            vectorize=True,
-        )
+    # Color videos have a channel dimension
+    core_dims = [frames_dim, *YX_PX, *(["channel"] if da.ndim == 4 else [])]
+    return apply_ufunc(
+        draw_text_video,
+        da,
+        identity_da(da, frames_dim),
+        input_core_dims=(core_dims, [frames_dim]),
+        output_core_dims=(core_dims,),
+    )
 
 
 def compose_da(da_image: DA, da_overlay: DA, color: tuple[int, int, int] = RED) -> DA:
-    """Draw text on images in a data array.
+    """Color images in a data array given overlays.
 
     Args:
         da_image: Image data array.
@@ -57,11 +47,10 @@ def compose_da(da_image: DA, da_overlay: DA, color: tuple[int, int, int] = RED)
         color: Color for the overlay.
     """
     return apply_ufunc(
-        overlay,
+        overlay_video,
         da_image,
         da_overlay,
         input_core_dims=(YX_PX, YX_PX),
         output_core_dims=([*YX_PX, "channel"],),
-        vectorize=True,
         kwargs=dict(color=color),
     )
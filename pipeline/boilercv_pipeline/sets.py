@@ -1,31 +1,69 @@
 """Datasets."""
 
-from collections.abc import Iterator
-from contextlib import contextmanager
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
+from datetime import datetime
+from functools import cache, partial
 from pathlib import Path
 from typing import Any
 
 from pandas import read_hdf
 from xarray import Dataset, open_dataset
 
-from boilercv.data import HEADER, ROI, VIDEO
-from boilercv.data.packing import unpack
-from boilercv.types import DF, DS
-from boilercv_pipeline.models.params import PARAMS
+from boilercv.data import CHUNK_FRAMES, FRAME, HEADER, ROI, VIDEO, XPX, XPX_PACKED, YPX
+from boilercv.data.contours import Contours
+from boilercv.data.packing import PackedVideo, unpack, unpack_bits
+from boilercv.types import DA, DF, DS, Img
+from boilercv_pipeline.cache import DatasetCache
+from boilercv_pipeline.manifest import Manifest
+from boilercv_pipeline.models.params import get_params
 from boilercv_pipeline.models.paths import get_sorted_paths
-from boilercv_pipeline.types import Stage
+from boilercv_pipeline.storage import (
+    CODEC,
+    decodes_slowly,
+    find_store,
+    memmap_video,
+    read_frame,
+    write_store,
+)
+from boilercv_pipeline.types import Codec, Stage
 
 ALL_FRAMES = slice(None)
 """Slice that gets all frames."""
-ALL_STEMS = [source.stem for source in get_sorted_paths(PARAMS.paths.sources)]
-"""The stems of all dataset sources."""
 STAGE_DEFAULT = "sources"
 """Default stage to work on."""
+DATASET_CACHE = DatasetCache()
+"""Cache of loaded datasets and contour tables."""
+LAZY_CHUNKS = {FRAME: CHUNK_FRAMES, YPX: -1, XPX: -1, XPX_PACKED: -1}
+"""Chunks for reading videos lazily, keeping frames whole even if stored in pieces."""
+CINE_FORMAT = r"Y%Y%m%dH%H%M%S"
+"""Format of CINE names by Phantom Cine Viewer's {timeS} scheme."""
+NAME_FORMAT = r"%Y-%m-%dT%H-%M-%S"
+"""Format of the names of videos converted from CINEs named by their time."""
+
+
+@cache
+def get_all_stems() -> list[str]:
+    """Get the stems of all dataset sources, finding them on first access."""
+    return [source.stem for source in get_sorted_paths(get_params().paths.sources)]
+
+
+def __getattr__(name: str) -> Any:
+    """Get the stems of all dataset sources as `ALL_STEMS` on first access."""
+    if name == "ALL_STEMS":
+        return get_all_stems()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @contextmanager
 def process_datasets(
-    destination_dir: Path, reprocess: bool = False
+    destination_dir: Path,
+    reprocess: bool = False,
+    codec: Codec = CODEC,
+    chunk_frames: int = CHUNK_FRAMES,
+    ext: str = "nc",
+    manifest: Manifest | None = None,
 ) -> Iterator[dict[str, Any]]:
     """Get unprocessed dataset names and write them to disk.
 
@@ -40,28 +78,39 @@ def process_datasets(
     Args:
         destination_dir: The directory to write datasets to.
         reprocess: Whether to reprocess all datasets.
+        codec: Compression codec for the video in written datasets.
+        chunk_frames: Number of frames in each compressed chunk of the video.
+        ext: Extension of written datasets, e.g. `zarr` to write Zarr stores.
+        manifest: Manifest of the inputs to each dataset. If given, datasets with
+            changed inputs are reprocessed, and inputs of written datasets are recorded.
     """
     unprocessed_destinations = get_unprocessed_destinations(
-        destination_dir, reprocess=reprocess
+        destination_dir, ext=ext, reprocess=reprocess, manifest=manifest
     )
     datasets_to_process = dict.fromkeys(unprocessed_destinations)
     yield datasets_to_process
     for name, ds in datasets_to_process.items():
         if ds is None:
             continue
-        ds.to_netcdf(
-            path=unprocessed_destinations[name], encoding={VIDEO: {"zlib": True}}
-        )
+        write_store(ds, unprocessed_destinations[name], codec, chunk_frames)
+        if manifest:
+            manifest.record(name)
 
 
 def get_unprocessed_destinations(
-    destination_dir: Path, ext: str = "nc", reprocess: bool = False
+    destination_dir: Path,
+    ext: str = "nc",
+    reprocess: bool = False,
+    manifest: Manifest | None = None,
 ) -> dict[str, Path]:
     """Get destination paths for unprocessed datasets.
 
     Given a destination directory, yield a mapping of unprocessed dataset names to
     destinations with a given file extension. A dataset is considered unprocessed if a
-    file sharing its name is not found in the destination directory.
+    file sharing its name is not found in the destination directory, or if a manifest
+    is given and the inputs of the dataset have changed since it was recorded. Existing
+    datasets never recorded in the manifest, e.g. those processed before it existed,
+    are recorded as they are rather than reprocessed.
 
     Parameters
     ----------
@@ -71,6 +120,8 @@ def get_unprocessed_destinations(
         The desired file extension. Default: nc
     reprocess
         Whether to reprocess all datasets. Default: False.
+    manifest
+        Manifest of the inputs to each dataset. Default: Only check for existence.
 
     Returns
     -------
@@ -78,9 +129,19 @@ def get_unprocessed_destinations(
     """
     unprocessed_destinations: dict[str, Path] = {}
     ext = ext.lstrip(".")
-    for name in ALL_STEMS:
+    if manifest and not reprocess:
+        manifest.seed(
+            name
+            for name in get_all_stems()
+            if (destination_dir / f"{name}.{ext}").exists()
+        )
+    for name in get_all_stems():
         destination = destination_dir / f"{name}.{ext}"
-        if reprocess or not destination.exists():
+        if (
+            reprocess
+            or not destination.exists()
+            or (manifest and manifest.is_stale(name))
+        ):
             unprocessed_destinations[name] = destination
     return unprocessed_destinations
 
@@ -89,8 +150,8 @@ def inspect_dataset(name: str, stage: Stage = STAGE_DEFAULT) -> DS:
     """Inspect a video dataset."""
     cmp_source, unc_source = get_stage(name, stage)
     source = unc_source if unc_source.exists() else cmp_source
-    if stage == "large_sources":
-        return open_dataset(source) if source.exists() else Dataset()
+    if stage == "large_sources" and not source.exists():
+        return Dataset()
     with open_dataset(source) as ds:
         return ds
 
@@ -100,60 +161,232 @@ def get_dataset(
     num_frames: int = 0,
     frame: slice = ALL_FRAMES,
     stage: Stage = STAGE_DEFAULT,
+    lazy: bool = False,
 ) -> DS:
-    """Load a video dataset."""
-    # Can't use `xarray.open_mfdataset` because it requires dask
-    # Unpacking is incompatible with dask
+    """Load a video dataset.
+
+    Args:
+        name: Name of the video.
+        num_frames: Number of frames to load.
+        frame: Slice of frames to load.
+        stage: Pipeline stage to load the video from.
+        lazy: Read and unpack frames in chunks only once they are accessed, e.g. by
+            selecting some frames and loading them.
+    """
     frame = slice_frames(num_frames, frame)
     cmp_source, unc_source = get_stage(name, stage)
     source = unc_source if unc_source.exists() else cmp_source
     if stage == "large_sources":
-        ds = open_dataset(source)
-        return (
-            Dataset({VIDEO: ds[VIDEO].sel(frame=frame), HEADER: ds[HEADER]})
-            if source.exists()
-            else Dataset()
-        )
-    roi = PARAMS.paths.rois / f"{name}.nc"
-    with open_dataset(source) as ds, open_dataset(roi) as roi_ds:
-        if not unc_source.exists():
+        if not source.exists():
+            return Dataset()
+        # Read large sources lazily, or just the selected frames, closing them after
+        with open_dataset(source, chunks=LAZY_CHUNKS if lazy else None) as ds:
+            large_ds = Dataset({VIDEO: ds[VIDEO].sel(frame=frame), HEADER: ds[HEADER]})
+            return large_ds if lazy else large_ds.load()
+    roi = find_store(get_params().paths.rois, name)
+    # Lazy datasets aren't cached
+    key = (
+        None
+        if lazy
+        else DATASET_CACHE.get_key(source, roi, kind="dataset", stage=stage)
+    )
+    if (cached := DATASET_CACHE.get(key, frame)) is not None:
+        return cached
+    chunks = LAZY_CHUNKS if lazy else None
+    with open_dataset(source, chunks=chunks) as ds, open_dataset(roi) as roi_ds:
+        # Only keep an uncompressed copy of sources which are slow to decode
+        if not unc_source.exists() and decodes_slowly(ds[VIDEO]):
             Dataset({VIDEO: ds[VIDEO], HEADER: ds[HEADER]}).to_netcdf(
-                path=unc_source, encoding={VIDEO: {"zlib": False}}
+                path=unc_source, encoding={VIDEO: {"zlib": False, "contiguous": True}}
             )
-        return Dataset({
-            VIDEO: unpack(ds[VIDEO].sel(frame=frame)),
+        loaded = Dataset({
+            VIDEO: unpack(get_packed(ds, source, chunks).sel(frame=frame)),
             ROI: roi_ds[ROI],
             HEADER: ds[HEADER],
         })
+        return loaded if lazy else DATASET_CACHE.put(key, loaded.load(), frame)
+
+
+def get_first_frames(
+    names: Iterable[str], stage: Stage = STAGE_DEFAULT, workers: int | None = None
+) -> dict[str, Img]:
+    """Get the first frame of each video, e.g. for thumbnails, reading just that frame.
+
+    Videos without sources are skipped.
+
+    Args:
+        names: Names of the videos.
+        stage: Pipeline stage to get frames from.
+        workers: Number of threads reading frames. Default: Executor default.
+    """
+    names = list(names)
+    with ThreadPoolExecutor(workers) as executor:
+        frames = executor.map(partial(get_first_frame, stage=stage), names)
+        return {
+            name: frame
+            for name, frame in zip(names, frames, strict=True)
+            if frame is not None
+        }
+
+
+def get_first_frame(name: str, stage: Stage = STAGE_DEFAULT) -> Img | None:
+    """Get the first frame of a video, reading just that frame.
+
+    Packed frames are unpacked. Large sources not yet converted to NetCDF are read
+    from their CINE. Returns `None` if the video has no source.
+
+    Args:
+        name: Name of the video.
+        stage: Pipeline stage to get the frame from.
+    """
+    cmp_source, unc_source = get_stage(name, stage)
+    source = unc_source if unc_source.exists() else cmp_source
+    if stage == "large_sources":
+        if source.exists():
+            return read_frame(source)
+        if cine := find_cine(name):
+            from boilercine import get_cine_images
+
+            return next(get_cine_images(cine, num_frames=1))
+        return None
+    return unpack_bits(read_frame(source)) if source.exists() else None
+
+
+def get_cine_name(cine: Path) -> str:
+    """Get the name of the video converted from a CINE.
+
+    CINEs named by Phantom Cine Viewer's {timeS} scheme give names of their time.
+    Other CINEs give names of their stem.
+    """
+    with suppress(ValueError):
+        return datetime.strptime(cine.stem, CINE_FORMAT).strftime(NAME_FORMAT)
+    return cine.stem
+
+
+def find_cine(name: str) -> Path | None:
+    """Find the CINE of a video, or `None` if it has none, reversing `get_cine_name`."""
+    cines = get_params().paths.cines
+    with suppress(ValueError):
+        stem = datetime.strptime(name, NAME_FORMAT).strftime(CINE_FORMAT)
+        if (cine := cines / f"{stem}.cine").exists():
+            return cine
+    return cine if (cine := cines / f"{name}.cine").exists() else None
+
+
+def get_packed_video(
+    name: str,
+    num_frames: int = 0,
+    frame: slice = ALL_FRAMES,
+    stage: Stage = STAGE_DEFAULT,
+) -> PackedVideo:
+    """Load a bit-packed video, decoding its frames only as they are accessed.
+
+    Frames of uncompressed videos are views into the page cache, so they aren't copied
+    until they are decoded.
+
+    Args:
+        name: Name of the video.
+        num_frames: Number of frames to load.
+        frame: Slice of frames to load.
+        stage: Pipeline stage to load the video from.
+    """
+    frame = slice_frames(num_frames, frame)
+    cmp_source, unc_source = get_stage(name, stage)
+    source = unc_source if unc_source.exists() else cmp_source
+    with open_dataset(source) as ds:
+        return PackedVideo.from_da(get_packed(ds, source).sel(frame=frame))
+
+
+def get_packed(ds: DS, source: Path, chunks: dict[str, int] | None = None) -> DA:
+    """Get the packed video of a dataset, memory-mapping it from its source if possible.
+
+    Args:
+        ds: Dataset opened from the source.
+        source: Source of the dataset.
+        chunks: Chunks for reading and unpacking frames lazily.
+    """
+    if (packed := memmap_video(source)) is None:
+        return ds[VIDEO]
+    video = ds[VIDEO].copy(data=packed)
+    return (
+        video.chunk({dim: chunks[dim] for dim in video.dims if dim in chunks})
+        if chunks
+        else video
+    )
 
 
 def get_stage(name: str, stage: Stage = STAGE_DEFAULT) -> tuple[Path, Path]:
     """Get the paths associated with a particular video name and pipeline stage."""
+    paths = get_params().paths
     if stage == "sources":
-        unc_source = PARAMS.paths.uncompressed_sources / f"{name}.nc"
-        return PARAMS.paths.sources / f"{name}.nc", unc_source
+        unc_source = paths.uncompressed_sources / f"{name}.nc"
+        return find_store(paths.sources, name), unc_source
     elif stage == "large_sources":
-        source = unc_source = PARAMS.paths.large_sources / f"{name}.nc"
+        source = unc_source = paths.large_sources / f"{name}.nc"
         return source, unc_source
     elif stage == "filled":
-        unc_source = PARAMS.paths.uncompressed_filled / f"{name}.nc"
-        return PARAMS.paths.filled / f"{name}.nc", unc_source
+        unc_source = paths.uncompressed_filled / f"{name}.nc"
+        return find_store(paths.filled, name), unc_source
     else:
         raise ValueError(f"Unknown stage: {stage}")
 
 
+def get_source_inputs(name: str) -> dict[str, Path]:
+    """Get the source and ROI of a video, e.g. as inputs for a manifest."""
+    return {
+        "source": get_stage(name)[0],
+        "roi": find_store(get_params().paths.rois, name),
+    }
+
+
+def get_contours_source(name: str) -> Path:
+    """Get the stored contours of a video, or its contour table if not yet stored."""
+    contours_dir = get_params().paths.contours
+    source = find_store(contours_dir, name)
+    return source if source.exists() else contours_dir / f"{name}.h5"
+
+
+def get_contours(name: str, num_frames: int = 0) -> Contours:
+    """Load contours of a video.
+
+    Args:
+        name: Name of the video.
+        num_frames: Number of frames, for contours stored in tables, which omit frames
+            without contours. Default: Through the last frame with contours.
+    """
+    source = find_store(get_params().paths.contours, name)
+    if not source.exists():
+        return Contours.from_df(get_contours_df(name), num_frames)
+    with open_dataset(source) as ds:
+        return Contours.from_dataset(ds)
+
+
 def get_contours_df(name: str) -> DF:
     """Load contours from a dataset."""
-    unc_cont = PARAMS.paths.uncompressed_contours / f"{name}.h5"
-    contour = unc_cont if unc_cont.exists() else PARAMS.paths.contours / f"{name}.h5"
+    paths = get_params().paths
+    if (source := find_store(paths.contours, name)).exists():
+        key = DATASET_CACHE.get_key(source, kind="contours")
+        if (cached := DATASET_CACHE.get(key)) is not None:
+            return cached
+        return DATASET_CACHE.put(key, get_contours(name).to_df())
+    # Fall back to contour tables, keeping uncompressed copies as they decode slowly
+    unc_cont = paths.uncompressed_contours / f"{name}.h5"
+    contour = unc_cont if unc_cont.exists() else paths.contours / f"{name}.h5"
+    key = DATASET_CACHE.get_key(contour, kind="contours")
+    if (cached := DATASET_CACHE.get(key)) is not None:
+        return cached
     contour_df: DF = read_hdf(contour)  # type: ignore  # pyright 1.1.333
     if not unc_cont.exists():
         contour_df.to_hdf(unc_cont, key="contours", complevel=None, complib=None)
-    return contour_df
+    return DATASET_CACHE.put(key, contour_df)
 
 
 def slice_frames(num_frames: int = 0, frame: slice = ALL_FRAMES) -> slice:
-    """Return a slice suitable for getting frames from datasets."""
+    """Return a slice suitable for getting frames from datasets.
+
+    Slices select frame numbers, including the stop, so e.g. `slice(None, 0)` selects
+    the first frame.
+    """
     if num_frames:
         if frame == ALL_FRAMES:
             frame = slice(None, num_frames - 1)
@@ -1,39 +1,125 @@
 """Fill bubble contours."""
 
+from pathlib import Path
+
+from dask import config as dask_config
+from dask import delayed
+from dask.array import concatenate, from_delayed
 from loguru import logger
+from numpy import empty, packbits, uint8
 from tqdm import tqdm
-from xarray import zeros_like
+from xarray import DataArray
 
-from boilercv.data import ROI, VIDEO
-from boilercv.data.packing import pack
-from boilercv.images import scale_bool
-from boilercv.images.cv import draw_contours
-from boilercv.types import ArrInt
+from boilercv.data import (
+    CHUNK_FRAMES,
+    FRAME,
+    ROI,
+    VIDEO,
+    XPX,
+    XPX_PACKED,
+    YPX,
+    get_frame_chunks,
+)
+from boilercv.data.contours import Contours
+from boilercv.images.cv import fill_contours
+from boilercv.types import DS, Vid
+from boilercv_pipeline.manifest import Manifest, get_module_paths
 from boilercv_pipeline.models.params import PARAMS
-from boilercv_pipeline.sets import get_contours_df, get_dataset, process_datasets
+from boilercv_pipeline.sets import (
+    get_contours,
+    get_contours_source,
+    get_dataset,
+    get_stage,
+    process_datasets,
+)
+
+FILL_WORKERS = 4
+"""Default number of threads filling contours in the frames of each chunk."""
+MODULES = ["boilercv.data.contours", "boilercv.images.cv", "boilercv_pipeline.storage"]
+"""Modules with code which affects filled videos, besides this stage."""
 
 
-def main():  # noqa: D103
+def main(chunk_frames: int = CHUNK_FRAMES, workers: int = FILL_WORKERS):  # noqa: D103
     destination = PARAMS.paths.filled
-    with process_datasets(destination) as videos_to_process:
+    manifest = Manifest(
+        destination,
+        inputs=get_inputs,
+        code=[PARAMS.paths.stages["fill"], *get_module_paths(*MODULES)],
+    )
+    with (
+        # Fill one chunk at a time as datasets are written, as threads fill its frames
+        dask_config.set(scheduler="synchronous"),
+        process_datasets(
+            destination, chunk_frames=chunk_frames, manifest=manifest
+        ) as videos_to_process,
+    ):
         for name in tqdm(videos_to_process):
-            df = get_contours_df(name)
-            source_ds = get_dataset(name)
-            ds = zeros_like(source_ds, dtype=source_ds[VIDEO].dtype)
-            video = ds[VIDEO]
-            if not df.empty:
-                for frame_num, frame in enumerate(video):
-                    contours: list[ArrInt] = list(  # type: ignore  # pyright 1.1.333
-                        df.loc[frame_num, :]
-                        .groupby("contour")
-                        .apply(lambda grp: grp.values)  # type: ignore  # pyright 1.1.333
-                    )
-                    video[frame_num, :, :] = draw_contours(
-                        scale_bool(frame.values), contours
-                    )
-            ds[VIDEO] = pack(video)
-            ds = ds.drop_vars(ROI)
-            videos_to_process[name] = ds
+            source_ds = get_dataset(name, lazy=True)
+            contours = get_contours(name, num_frames=source_ds.sizes[FRAME])
+            videos_to_process[name] = fill_dataset(
+                source_ds, contours, chunk_frames, workers
+            )
+
+
+def get_inputs(name: str) -> dict[str, Path]:
+    """Get the inputs to filling contours in a video."""
+    return {"source": get_stage(name)[0], "contours": get_contours_source(name)}
+
+
+def fill_dataset(
+    source_ds: DS,
+    contours: Contours,
+    chunk_frames: int = CHUNK_FRAMES,
+    workers: int = 1,
+) -> DS:
+    """Get a dataset of filled contours, lazily filled and packed in chunks of frames.
+
+    Only the shape and coordinates of the source video are used, so the source video
+    is never loaded. Each chunk of frames is filled and packed as it is computed, e.g.
+    while writing, so the unpacked filled video never exists in memory.
+
+    Args:
+        source_ds: Source dataset.
+        contours: Contours in each frame of the source video.
+        chunk_frames: Number of frames to fill at once.
+        workers: Number of threads filling contours in the frames of each chunk.
+    """
+    video = source_ds[VIDEO]
+    num_frames, height, width = (video.sizes[dim] for dim in (FRAME, YPX, XPX))
+    packed_width = -(-width // 8)
+    packed = concatenate([
+        from_delayed(
+            delayed(fill_chunk, pure=False)(contours, (height, width), chunk, workers),
+            shape=(chunk.stop - chunk.start, height, packed_width),
+            dtype=uint8,
+        )
+        for chunk in get_frame_chunks(num_frames, chunk_frames)
+    ])
+    ds = source_ds.drop_vars([VIDEO, ROI])
+    ds[VIDEO] = DataArray(
+        packed,
+        dims=(FRAME, YPX, XPX_PACKED),
+        coords={
+            name: coord for name, coord in video.coords.items() if XPX not in coord.dims
+        },
+        attrs=video.attrs,
+    )
+    return ds
+
+
+def fill_chunk(
+    contours: Contours, shape: tuple[int, int], frames: slice, workers: int = 1
+) -> Vid:
+    """Fill and pack contours in consecutive frames.
+
+    Args:
+        contours: Contours in each frame.
+        shape: Shape of each frame.
+        frames: Consecutive frames to fill.
+        workers: Number of threads filling contours in the frames.
+    """
+    filled = empty((frames.stop - frames.start, *shape), dtype=uint8)
+    return packbits(fill_contours(contours, filled, workers, frames.start), axis=-1)
 
 
 if __name__ == "__main__":
@@ -1,72 +1,156 @@
 """Get bubble contours."""
 
-from cv2 import CHAIN_APPROX_SIMPLE, bitwise_not
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
+from os import cpu_count
+from pathlib import Path
+
+from cv2 import CHAIN_APPROX_SIMPLE
+from dask import config as dask_config
 from loguru import logger
-from numpy import empty, insert, vstack
-from pandas import DataFrame
+from numpy import asarray, uint8
+from pandas import read_hdf
 
-from boilercv.data import VIDEO
-from boilercv.images import scale_bool
+from boilercv.data import CHUNK_FRAMES, FRAME, VIDEO, get_frame_chunks
+from boilercv.data.contours import Contours
 from boilercv.images.cv import find_contours
-from boilercv.types import DF, Vid
+from boilercv.types import DA, DF, ArrInt, Img, ImgBool, Vid
+from boilercv_pipeline.manifest import Manifest, get_module_paths
 from boilercv_pipeline.models.params import PARAMS
-from boilercv_pipeline.sets import get_dataset, get_unprocessed_destinations
+from boilercv_pipeline.models.paths import atomic_write
+from boilercv_pipeline.sets import (
+    get_all_stems,
+    get_contours_source,
+    get_dataset,
+    get_source_inputs,
+    get_unprocessed_destinations,
+    inspect_dataset,
+)
+from boilercv_pipeline.storage import write_contours
+
+METHOD = CHAIN_APPROX_SIMPLE
+"""Contour approximation method."""
+FRAME_WORKERS = 4
+"""Default number of threads finding contours in the frames of each video."""
+MODULES = ["boilercv.data.contours", "boilercv.images.cv", "boilercv_pipeline.storage"]
+"""Modules with code which affects found contours, besides this stage."""
+
 
+def main(frame_workers: int = FRAME_WORKERS):  # noqa: D103
+    manifest = Manifest(
+        PARAMS.paths.contours,
+        inputs=get_source_inputs,
+        params={"method": METHOD},
+        code=[PARAMS.paths.stages["find_contours"], *get_module_paths(*MODULES)],
+    )
+    store_contour_tables()
+    destinations = get_unprocessed_destinations(
+        PARAMS.paths.contours, manifest=manifest
+    )
+    # Find contours in several videos at once if there are spare cores
+    video_workers = max(1, (cpu_count() or 1) // frame_workers)
+    with ProcessPoolExecutor(max_workers=video_workers) as executor:
+        futures = {
+            executor.submit(
+                find_video_contours, source_name, destination, frame_workers
+            ): source_name
+            for source_name, destination in destinations.items()
+        }
+        for future in as_completed(futures):
+            future.result()
+            manifest.record(futures[future])
 
-def main():  # noqa: D103
-    destinations = get_unprocessed_destinations(PARAMS.paths.contours, ext="h5")
-    for source_name, destination in destinations.items():
-        video = bitwise_not(scale_bool(get_dataset(source_name)[VIDEO].values))
-        df = get_all_contours(video, method=CHAIN_APPROX_SIMPLE)
-        df.to_hdf(destination, "contours", complib="zlib", complevel=9)
+
+def store_contour_tables():
+    """Store contours in tables as ragged arrays, then remove the tables.
+
+    Contours are converted without finding them again, and are then current, as are
+    other contours stored before the manifest existed. Uncompressed copies of the tables
+    are also removed, since stored contours are read instead.
+    """
+    for name in get_all_stems():
+        table = get_contours_source(name)
+        if table.suffix != ".h5" or not table.exists():
+            continue
+        # Tables omit frames without contours, so get the number of frames separately
+        contours = Contours.from_df(
+            read_hdf(table),  # type: ignore  # pyright 1.1.333
+            num_frames=inspect_dataset(name).sizes[FRAME],
+        )
+        with atomic_write(table.with_suffix(".nc")) as temp:
+            write_contours(contours, temp)
+        table.unlink()
+        (PARAMS.paths.uncompressed_contours / table.name).unlink(missing_ok=True)
+
+
+def find_video_contours(source_name: str, destination: Path, workers: int):
+    """Find bubble contours in a video and write them to disk.
+
+    Args:
+        source_name: Name of the binarized video.
+        destination: Destination for the contours.
+        workers: Number of threads finding contours in frames.
+    """
+    # Bubbles are dark in binarized videos, so find contours in the inverted video
+    video = ~get_dataset(source_name, lazy=True)[VIDEO]
+    # Chunks already load while threads find contours. Dask's thread pool is also left
+    # unusable in processes forked after the parent used it
+    with dask_config.set(scheduler="synchronous"):
+        contours = find_all_contours(video, METHOD, workers=workers)
+    write_contours(contours, destination)
 
 
-def get_all_contours(video: Vid, method) -> DF:
+def get_all_contours(
+    video: Vid | DA, method, chunk_frames: int = CHUNK_FRAMES, workers: int | None = 1
+) -> DF:
     """Get all contours in a video.
 
     Produces a dataframe with a multi-index of the video frame and contour number, and
     two columns indicating the "y" and "x" pixel locations of contour vertices.
 
     Args:
-        video: Video to get contours from.
+        video: Video to get contours of bright objects from, or a binarized video to
+            get contours of true regions from. May be a lazily-loaded data array.
         method: The contour approximation method to use.
+        chunk_frames: Number of frames to load at once.
+        workers: Number of threads finding contours. Default: Executor default.
     """
-    # This nested, pure-numpy approach is a bit hard to follow, but it is much faster
-    # than the more readable approach of building and concatenating dataframes. The
-    # overhead of dataframe creation over ~6000 frames is significant.
-    try:
-        # Vertically stack the contours detected in each frame
-        all_contours = vstack(
-            # For each frame in the video...
-            [
-                # Compose two columns, the frame number and the contours
-                insert(
-                    axis=1,  # Insert column-wise
-                    obj=0,  # Insert at the beginning, e.g. prepend
-                    values=frame_num,
-                    # Vertically stack the pixel locations of each contour
-                    arr=vstack(
-                        # For each contour in the frame...
-                        [
-                            # Prepend the contour number to the contour locations
-                            insert(axis=1, obj=0, values=cont_num, arr=contour)
-                            for cont_num, contour in enumerate(
-                                find_contours(image, method)
-                            )
-                        ]
-                    ),
-                )
-                for frame_num, image in enumerate(video)
-            ]
-        )
-    except ValueError:
-        # Some frames may have no contours. Signal this with an empty array
-        logger.warning("No contours found in this frame.")
-        all_contours = empty((0, 4))
-    # Build the dataframe at the very end to avoid the overhead
-    return DataFrame(
-        all_contours, columns=["frame", "contour", "ypx", "xpx"]
-    ).set_index(["frame", "contour"])
+    return find_all_contours(video, method, chunk_frames, workers).to_df()
+
+
+def find_all_contours(
+    video: Vid | DA, method, chunk_frames: int = CHUNK_FRAMES, workers: int | None = 1
+) -> Contours:
+    """Find all contours in a video.
+
+    Frames are loaded in chunks, and contours are found in the frames of each chunk by
+    worker threads while the next chunk loads. OpenCV releases the GIL, so threads find
+    contours in parallel.
+
+    Args:
+        video: Video to get contours of bright objects from, or a binarized video to
+            get contours of true regions from. May be a lazily-loaded data array.
+        method: The contour approximation method to use.
+        chunk_frames: Number of frames to load at once.
+        workers: Number of threads finding contours. Default: Executor default.
+    """
+    contours: list[list[ArrInt]] = []
+    find = partial(find_frame_contours, method=method)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: Iterator[list[ArrInt]] = iter([])
+        for chunk in get_frame_chunks(len(video), chunk_frames):
+            frames = asarray(video[chunk])
+            contours.extend(pending)
+            pending = executor.map(find, frames)
+        contours.extend(pending)
+    return Contours.from_frames(contours)
+
+
+def find_frame_contours(image: Img | ImgBool, method) -> list[ArrInt]:
+    """Find contours in an image, or of true regions in a binarized image."""
+    # OpenCV treats nonzero pixels as bright, so view bools as bytes instead of scaling
+    return find_contours(image.view(uint8) if image.dtype == bool else image, method)
 
 
 if __name__ == "__main__":
@@ -1,72 +1,104 @@
 """Update previews for various stages."""
 
-from collections.abc import Iterator
+from collections.abc import Iterator, Sequence
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 
-from xarray import combine_by_coords, open_dataset
+from numpy import zeros
+from xarray import open_dataset
 
 from boilercv.data import VIDEO, VIDEO_NAME, XPX, YPX, assign_ds
 from boilercv.data.models import Dimension
-from boilercv.types import DS
-from boilercv_pipeline.captivate.previews import pad_images
-from boilercv_pipeline.sets import ALL_STEMS
+from boilercv.types import DS, Img, Vid
+from boilercv_pipeline.sets import get_all_stems
+from boilercv_pipeline.storage import append_store, can_append, write_store
 
 
 @contextmanager
 def new_videos_to_preview(
     destination: Path, reprocess: bool = False
 ) -> Iterator[dict[str, Any]]:
-    """Get empty mapping of new videos to preview and write to disk."""
+    """Get empty mapping of new videos to preview and write to disk.
+
+    Previews are padded to a common canvas and appended along an unlimited video name
+    dimension, so existing previews aren't rewritten. Previews are only rebuilt if new
+    previews don't fit on the canvas, or if the video name dimension is not unlimited.
+    """
     # Yield a mapping of new video names to previews, to be populated by the user
-    if reprocess:
-        # Reprocess all names
-        new_video_names = ALL_STEMS
-    else:
-        # Get the names missing from the destination
-        existing_names: list[str] = []
-        if destination.exists():
-            with open_dataset(destination) as existing_ds:
-                existing_names.extend(list(existing_ds[VIDEO_NAME].values))
-        new_video_names = [name for name in ALL_STEMS if name not in existing_names]
+    existing_names: list[str] = []
+    canvas: tuple[int, ...] = ()
+    if not reprocess and destination.exists():
+        with open_dataset(destination) as existing_ds:
+            existing_names.extend(list(existing_ds[VIDEO_NAME].values))
+            canvas = existing_ds[VIDEO].shape[1:]
+    new_video_names = [name for name in get_all_stems() if name not in existing_names]
     videos_to_preview = dict.fromkeys(new_video_names)
 
     yield videos_to_preview
 
-    # Keep only valid received previews and build a dataset of new previews
-    if received_previews := {
+    # Keep only valid received previews
+    received_previews = {
         video_name: preview
         for video_name, preview in videos_to_preview.items()
         if preview is not None and video_name in new_video_names
-    }:
-        received_video_names = list(received_previews.keys())
-        received_previews = list(received_previews.values())
-        new_ds = get_preview_ds(received_video_names, received_previews)
-
-        if not reprocess and destination.exists():
-            with open_dataset(destination) as existing_ds:
-                if new_ds[VIDEO].shape == existing_ds[VIDEO].shape:
-                    # Combine datasets if they're the same shape
-                    new_ds = combine_by_coords([existing_ds, new_ds])
-                else:
-                    # Otherwise: destructure, pad, and rebuild them together
-                    existing_names = list(existing_ds[VIDEO_NAME].values)
-                    new_ds = get_preview_ds(
-                        existing_names + received_video_names,
-                        received_previews + list(existing_ds.video.values),
-                    )
-
-        new_ds.to_netcdf(path=destination, encoding={VIDEO: {"zlib": True}})
-
-
-def get_preview_ds(preview_names: list[str], previews: list[Any]) -> DS:
-    """Get a dataset of preview images, padding sizes as necessary."""
+    }
+    if not received_previews:
+        return
+    names = list(received_previews.keys())
+    previews = list(received_previews.values())
+
+    # Append new previews if they fit on the canvas of existing previews
+    if (
+        existing_names
+        and get_canvas(previews, canvas) == canvas
+        and can_append(destination, VIDEO_NAME)
+    ):
+        append_store(
+            get_preview_ds(names, pad_to_canvas(previews, canvas)), destination
+        )
+        return
+
+    # Otherwise, rebuild previews on a canvas that fits them all
+    if existing_names:
+        with open_dataset(destination) as existing_ds:
+            names = existing_names + names
+            previews = [*existing_ds[VIDEO].values, *previews]
+    write_store(
+        get_preview_ds(names, pad_to_canvas(previews, get_canvas(previews))),
+        destination,
+        unlimited_dims=[VIDEO_NAME],
+    )
+
+
+def get_canvas(images: Sequence[Img], canvas: Sequence[int] = ()) -> tuple[int, ...]:
+    """Get the shape of the smallest canvas that fits images and an existing canvas."""
+    shapes = [image.shape for image in images]
+    if canvas:
+        shapes.append(tuple(canvas))
+    return tuple(max(sizes) for sizes in zip(*shapes, strict=True))
+
+
+def pad_to_canvas(images: Sequence[Img], canvas: Sequence[int]) -> Vid:
+    """Pad images to the center of a canvas and pack them into an array."""
+    padded = zeros((len(images), *canvas), dtype=images[0].dtype)
+    for image, padded_image in zip(images, padded, strict=True):
+        padded_image[
+            tuple(
+                slice((size - image_size) // 2, (size - image_size) // 2 + image_size)
+                for size, image_size in zip(canvas, image.shape, strict=True)
+            )
+        ] = image
+    return padded
+
+
+def get_preview_ds(preview_names: list[str], previews: Vid) -> DS:
+    """Get a dataset of preview images padded to a common canvas."""
     return assign_ds(
         name=VIDEO,
         long_name="Video preview",
         units="Pixel state",
-        data=pad_images(previews),
+        data=previews,
         dims=(
             Dimension(dim=VIDEO_NAME, long_name="Video name", coords=preview_names),
             Dimension(dim=YPX, long_name="Height", units="px"),
@@ -1,11 +1,9 @@
 """Update previews for the filled contours stage."""
 
 from loguru import logger
-from tqdm import tqdm
 
-from boilercv.data import FRAME, VIDEO
 from boilercv_pipeline.models.params import PARAMS
-from boilercv_pipeline.sets import get_dataset
+from boilercv_pipeline.sets import get_first_frames
 from boilercv_pipeline.stages.preview import new_videos_to_preview
 
 
@@ -13,9 +11,7 @@ def main():  # noqa: D103
     stage = "filled"
     destination = PARAMS.paths.filled_preview
     with new_videos_to_preview(destination) as videos_to_preview:
-        for video_name in tqdm(videos_to_preview):
-            ds = get_dataset(video_name, stage=stage, num_frames=1)
-            videos_to_preview[video_name] = ds[VIDEO].isel({FRAME: 0}).values
+        videos_to_preview.update(get_first_frames(videos_to_preview, stage=stage))
 
 
 if __name__ == "__main__":
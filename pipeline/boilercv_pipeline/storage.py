@@ -0,0 +1,397 @@
+"""Storage of pipeline datasets, in NetCDF files or Zarr stores."""
+
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from h5py import File, is_hdf5
+from loguru import logger
+from netCDF4 import Dataset as NetCDFFile
+from numcodecs import Blosc
+from numpy import array, ascontiguousarray, memmap, ndindex
+from xarray import open_dataset
+from xarray.conventions import encode_cf_variable
+
+from boilercv.data import CHUNK_FRAMES, FRAME, VIDEO, VIDEO_NAME
+from boilercv.data.contours import Contours
+from boilercv.types import DA, DS, Img, Vid
+from boilercv_pipeline.types import Codec
+
+CODEC: Codec = "zstd"
+"""Default codec for video datasets, fast to decode and able to store any data."""
+CODECS: dict[Codec, dict[str, Any]] = {
+    "none": {"zlib": False},
+    "zlib": {"zlib": True},
+    "zstd": {"compression": "zstd", "complevel": 1},
+    "blosc_lz4": {"compression": "blosc_lz4", "complevel": 5, "blosc_shuffle": 1},
+    "blosc_zstd": {"compression": "blosc_zstd", "complevel": 3, "blosc_shuffle": 1},
+}
+"""NetCDF encodings for each codec."""
+ZARR_CODECS: dict[Codec, tuple[dict[str, Any], ...]] = {
+    "none": (),
+    # Zarr has no zlib codec, but gzip also deflates
+    "zlib": ({"name": "gzip", "configuration": {"level": 4}},),
+    "zstd": ({"name": "zstd", "configuration": {"level": 1}},),
+    "blosc_lz4": (
+        {
+            "name": "blosc",
+            "configuration": {"cname": "lz4", "clevel": 5, "shuffle": "shuffle"},
+        },
+    ),
+    "blosc_zstd": (
+        {
+            "name": "blosc",
+            "configuration": {"cname": "zstd", "clevel": 3, "shuffle": "shuffle"},
+        },
+    ),
+}
+"""Zarr compressors for each codec, as specifications so `zarr` is imported lazily."""
+BLOSC_ENCODING = {"compression", "complevel", "blosc_shuffle"}
+"""Keys of NetCDF encodings which configure Blosc compression."""
+SLOW_CODECS: list[Codec] = ["zlib"]
+"""Codecs which decode too slowly for repeated reads of entire videos."""
+DECODED_ATTRS = {"_FillValue", "missing_value", "scale_factor", "add_offset", "dtype"}
+"""Attributes which `xarray` decodes, so videos with them can't be read directly."""
+
+ZARR = ".zarr"
+"""Extension of Zarr stores."""
+
+
+def is_zarr(path: Path) -> bool:
+    """Check whether a dataset path refers to a Zarr store."""
+    return path.suffix == ZARR
+
+
+def find_store(directory: Path, name: str, ext: str = "nc") -> Path:
+    """Find the dataset with a name in a directory, preferring a Zarr store if found.
+
+    Args:
+        directory: Directory containing the dataset.
+        name: Name of the dataset.
+        ext: Extension of the dataset if no Zarr store is found. Default: nc
+    """
+    store = directory / f"{name}{ZARR}"
+    return store if store.exists() else directory / f"{name}.{ext.lstrip('.')}"
+
+
+def write_store(
+    ds: DS,
+    destination: Path,
+    codec: Codec = CODEC,
+    chunk_frames: int = CHUNK_FRAMES,
+    unlimited_dims: Sequence[str] = (),
+):
+    """Write a dataset to a NetCDF file or to a Zarr store, replacing any existing one.
+
+    Args:
+        ds: Dataset, possibly with a video to compress.
+        destination: NetCDF file, or Zarr store if it has a Zarr extension.
+        codec: Compression codec for the video.
+        chunk_frames: Number of frames in each compressed chunk of the video.
+        unlimited_dims: Dimensions of a NetCDF file to append to later, e.g. with
+            `append_store`. Dimensions of Zarr stores are always unlimited.
+    """
+    encoding = (
+        {VIDEO: get_encoding(ds[VIDEO], codec, chunk_frames, zarr=is_zarr(destination))}
+        if VIDEO in ds
+        else {}
+    )
+    if is_zarr(destination):
+        ds.to_zarr(destination, mode="w", encoding=encoding)
+    else:
+        to_netcdf(ds, destination, encoding, unlimited_dims)
+
+
+def to_netcdf(
+    ds: DS,
+    destination: Path,
+    encoding: dict[str, dict[str, Any]],
+    unlimited_dims: Sequence[str] = (),
+):
+    """Write a dataset to a NetCDF file, not compressing what Blosc can't compress.
+
+    The Blosc filter of NetCDF fails to write chunks that it can't compress, such as
+    chunks of noisy frames, rather than storing them as-is like Zarr does. So variables
+    to be compressed with Blosc are checked chunk by chunk before writing, and are
+    written uncompressed if any chunk is incompressible. Lazy variables would have to be
+    computed an extra time for the check, so they are compressed with Zstandard outside
+    of Blosc instead, which stores any chunk.
+
+    Args:
+        ds: Dataset.
+        destination: NetCDF file.
+        encoding: Encoding of each variable.
+        unlimited_dims: Dimensions of the NetCDF file to append to later.
+    """
+    encoding = {
+        name: get_blosc_encoding(ds[name], enc) if is_blosc(enc) else enc
+        for name, enc in encoding.items()
+    }
+    ds.to_netcdf(
+        path=destination, encoding=encoding, unlimited_dims=list(unlimited_dims)
+    )
+
+
+def is_blosc(encoding: dict[str, Any]) -> bool:
+    """Check whether a NetCDF encoding compresses with Blosc."""
+    return str(encoding.get("compression", "")).startswith("blosc")
+
+
+def get_blosc_encoding(da: DA, encoding: dict[str, Any]) -> dict[str, Any]:
+    """Get the NetCDF encoding of a variable, uncompressed if Blosc can't compress it.
+
+    Lazy variables are compressed with Zstandard outside of Blosc instead.
+
+    Args:
+        da: Variable to compress.
+        encoding: NetCDF encoding with Blosc compression.
+    """
+    if da.chunks is not None:
+        logger.warning(
+            f"Blosc can't check lazy {da.name}, so it will be compressed with zstd."
+        )
+        return {
+            **{k: v for k, v in encoding.items() if k not in BLOSC_ENCODING},
+            **CODECS["zstd"],
+        }
+    chunks = encoding.get("chunksizes") or da.shape
+    if 0 in chunks:
+        return encoding
+    # Check the same chunks that the Blosc filter would compress
+    encoding = {**encoding, "chunksizes": tuple(chunks)}
+    compressor = Blosc(
+        cname=encoding["compression"].removeprefix("blosc_"),
+        clevel=encoding.get("complevel", 5),
+        shuffle=encoding.get("blosc_shuffle", Blosc.SHUFFLE),
+    )
+    for index in ndindex(
+        *(-(-size // chunk) for size, chunk in zip(da.shape, chunks, strict=True))
+    ):
+        slices = tuple(
+            slice(i * c, (i + 1) * c) for i, c in zip(index, chunks, strict=True)
+        )
+        chunk = ascontiguousarray(da.data[slices])
+        if len(compressor.encode(chunk)) > chunk.nbytes:
+            logger.warning(
+                f"Blosc can't compress {da.name}, so it will be written uncompressed."
+            )
+            return {
+                **{k: v for k, v in encoding.items() if k not in BLOSC_ENCODING},
+                **CODECS["none"],
+            }
+    return encoding
+
+
+def write_contours(contours: Contours, destination: Path, codec: Codec = CODEC):
+    """Write contours to a NetCDF file or to a Zarr store, replacing any existing one.
+
+    Args:
+        contours: Contours.
+        destination: NetCDF file, or Zarr store if it has a Zarr extension.
+        codec: Compression codec.
+    """
+    ds = contours.to_dataset()
+    if is_zarr(destination):
+        ds.to_zarr(
+            destination,
+            mode="w",
+            encoding={
+                name: {"compressors": ZARR_CODECS[codec]} for name in ds.data_vars
+            },
+        )
+    else:
+        to_netcdf(ds, destination, dict.fromkeys(ds.data_vars, CODECS[codec]))
+
+
+def init_store(
+    template: DS,
+    destination: Path,
+    codec: Codec = CODEC,
+    chunk_frames: int = CHUNK_FRAMES,
+):
+    """Initialize a Zarr store so that workers may write its frames concurrently.
+
+    Writes metadata and data not backed by `dask`. Data backed by `dask` is left to be
+    filled in later with `write_frames`, so a template may be built with e.g.
+    `xarray.zeros_like` over a lazy video.
+
+    Args:
+        template: Dataset with the shape, type, and attributes of the final dataset.
+        destination: Zarr store.
+        codec: Compression codec for the video.
+        chunk_frames: Number of frames in each compressed chunk of the video.
+    """
+    template.to_zarr(
+        destination,
+        mode="w",
+        compute=False,
+        encoding={VIDEO: get_encoding(template[VIDEO], codec, chunk_frames, zarr=True)},
+    )
+
+
+def write_frames(ds: DS, destination: Path, frame: slice):
+    """Write a range of frames into a Zarr store initialized by `init_store`.
+
+    Workers may concurrently write distinct frame ranges that start and stop on chunk
+    boundaries, since each chunk is then written by exactly one worker.
+
+    Args:
+        ds: Dataset with just the frames to write.
+        destination: Zarr store.
+        frame: Range of frames to write to.
+    """
+    ds = ds.drop_vars([
+        name for name, da in ds.variables.items() if FRAME not in da.dims
+    ])
+    ds.to_zarr(destination, region={FRAME: frame})
+
+
+def can_append(destination: Path, dim: str = VIDEO_NAME) -> bool:
+    """Check whether a dataset may be appended to along a dimension.
+
+    NetCDF files compressed with Blosc aren't appended to, as appending chunks that
+    Blosc can't compress would fail partway, so they should be rewritten instead.
+
+    Args:
+        destination: NetCDF file or Zarr store.
+        dim: Dimension to append along.
+    """
+    if not destination.exists():
+        return False
+    if is_zarr(destination):
+        return True
+    with NetCDFFile(destination) as file:
+        return (
+            dim in file.dimensions
+            and file.dimensions[dim].isunlimited()
+            and not any(
+                variable.filters().get("blosc")
+                for variable in file.variables.values()
+                if dim in variable.dimensions
+            )
+        )
+
+
+def append_store(ds: DS, destination: Path, dim: str = VIDEO_NAME):
+    """Append to a NetCDF file or Zarr store along a dimension, writing only new data.
+
+    Appending to a NetCDF file requires that the dimension is unlimited, e.g. by
+    writing it with `write_store` and `unlimited_dims`. Check with `can_append`.
+
+    Args:
+        ds: Dataset matching the existing dataset, except along the dimension.
+        destination: NetCDF file, or Zarr store if it has a Zarr extension.
+        dim: Dimension to append along.
+    """
+    if is_zarr(destination):
+        ds.to_zarr(destination, append_dim=dim)
+        return
+    with NetCDFFile(destination, mode="a") as file:
+        start = file.dimensions[dim].size
+        for name, variable in ds.variables.items():
+            if dim not in variable.dims:
+                continue
+            # Encode e.g. booleans as they are encoded when writing with `xarray`
+            encoded = encode_cf_variable(variable, name=name)
+            file[name][
+                tuple(
+                    slice(start, start + variable.sizes[dim])
+                    if d == dim
+                    else slice(None)
+                    for d in variable.dims
+                )
+            ] = encoded.values
+
+
+def memmap_video(path: Path) -> Vid | None:
+    """Memory-map the video of a NetCDF file, if stored uncompressed and contiguously.
+
+    Frames sliced from the video are views into the page cache, so they aren't copied
+    until they are unpacked, and processes reading the same video share its pages.
+    Returns `None` if the video can't be memory-mapped, such as if it is compressed.
+
+    Args:
+        path: NetCDF file.
+    """
+    if is_zarr(path) or not path.exists() or not is_hdf5(path):
+        return None
+    with File(path, "r") as file:
+        video = file.get(VIDEO)
+        # Chunked, e.g. compressed, videos have no offset
+        if video is None or (offset := video.id.get_offset()) is None:
+            return None
+        if DECODED_ATTRS & set(video.attrs):
+            return None
+        dtype, shape = video.dtype, video.shape
+    return memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+
+def read_frame(path: Path, frame: int = 0) -> Img:
+    """Read just one frame of the video in a NetCDF file or Zarr store.
+
+    Contiguous videos are read by the offset of the frame. Otherwise, frames are read
+    from chunks, decoding only the chunk containing the frame if chunks are compressed.
+
+    Args:
+        path: NetCDF file or Zarr store.
+        frame: Frame number.
+    """
+    if (video := memmap_video(path)) is not None:
+        return array(video[frame])
+    if not is_zarr(path) and is_hdf5(path):
+        with File(path, "r") as file:
+            if not DECODED_ATTRS & set(file[VIDEO].attrs):
+                return file[VIDEO][frame]
+    with open_dataset(path) as ds:
+        return ds[VIDEO].isel({FRAME: frame}).values
+
+
+def get_encoding(
+    da: DA, codec: Codec = CODEC, chunk_frames: int = CHUNK_FRAMES, zarr: bool = False
+) -> dict[str, Any]:
+    """Get the encoding of a video, compressed in chunks of frames or videos.
+
+    Args:
+        da: Video data array with a frame or video name dimension.
+        codec: Compression codec.
+        chunk_frames: Number of frames in each chunk.
+        zarr: Whether to get the encoding for a Zarr store instead of NetCDF.
+    """
+    chunks = tuple(
+        get_chunk_size(dim, size, chunk_frames) for dim, size in da.sizes.items()
+    )
+    if zarr:
+        return {"compressors": ZARR_CODECS[codec], "chunks": chunks}
+    return {**CODECS[codec], "chunksizes": chunks}
+
+
+def get_chunk_size(dim: Any, size: int, chunk_frames: int = CHUNK_FRAMES) -> int:
+    """Get the chunk size along a dimension, chunking by frames and by videos."""
+    if dim == FRAME:
+        return min(chunk_frames, size)
+    if dim == VIDEO_NAME:
+        return 1
+    return size
+
+
+def get_codec(da: DA) -> Codec:
+    """Get the codec of a video read from a NetCDF file or Zarr store."""
+    encoding = da.encoding
+    if compressors := encoding.get("compressors"):
+        config = compressors[0].to_dict()
+        if config["name"] == "blosc":
+            cname = config["configuration"]["cname"]
+            return f"blosc_{cname}"  # type: ignore  # pyright 1.1.333
+        return "zlib" if config["name"] == "gzip" else config["name"]
+    if blosc := encoding.get("blosc"):
+        return blosc["compressor"]
+    if encoding.get("zstd"):
+        return "zstd"
+    if encoding.get("zlib"):
+        return "zlib"
+    return "none"
+
+
+def decodes_slowly(da: DA) -> bool:
+    """Check whether a video read from a NetCDF file or Zarr store is slow to decode."""
+    return get_codec(da) in SLOW_CODECS
@@ -9,3 +9,5 @@ NbProcess: TypeAlias = Callable[[Path, SimpleNamespace], None]
 """Notebook process."""
 Stage: TypeAlias = Literal["large_sources", "sources", "filled"]
 """Stage."""
+Codec: TypeAlias = Literal["none", "zlib", "zstd", "blosc_lz4", "blosc_zstd"]
+"""Compression codec for datasets."""
@@ -4,10 +4,16 @@ from dataclasses import asdict
 from pathlib import Path
 
 from boilercine import get_cine_attributes, get_cine_images
+from dask import config as dask_config
+from dask import delayed
+from dask.array import Array, concatenate, from_delayed
+from numpy import empty
+from numpy.typing import DTypeLike
 from scipy.spatial.distance import euclidean
 from xarray import DataArray
 
 from boilercv.data import (
+    CHUNK_FRAMES,
     FRAME,
     HEADER,
     LENGTH,
@@ -20,15 +26,27 @@ from boilercv.data import (
     YPX,
     YX,
     assign_ds,
+    get_frame_chunks,
 )
 from boilercv.data.models import Dimension
-from boilercv.types import DA, DS, ArrInt
+from boilercv.types import DA, DS, ArrInt, Vid
 
 
 def prepare_dataset(
-    cine_source: Path, num_frames: int | None = None, start_frame: int = 0
+    cine_source: Path,
+    num_frames: int | None = None,
+    start_frame: int = 0,
+    chunk_frames: int = 0,
 ) -> DS:
-    """Prepare a dataset from a CINE."""
+    """Prepare a dataset from a CINE.
+
+    Args:
+        cine_source: CINE to prepare a dataset from.
+        num_frames: Number of frames to read. Default: All frames.
+        start_frame: Frame to start reading from.
+        chunk_frames: If nonzero, read frames lazily in chunks of this many frames
+            instead of reading the whole video into memory.
+    """
     # Header
     header, utc_arr = get_cine_attributes(
         cine_source, TIMEZONE, num_frames, start_frame
@@ -61,12 +79,90 @@ def prepare_dataset(
             Dimension(dim=XPX, long_name="Width", units="px"),
         ),
         fixed_secondary_dims=(time, utc),
-        data=list(get_cine_images(cine_source, num_frames, start_frame)),
+        data=(
+            get_chunked_cine_images(
+                cine_source, len(utc_arr), start_frame, chunk_frames
+            )
+            if chunk_frames
+            else list(get_cine_images(cine_source, num_frames, start_frame))
+        ),
     )
     ds[header_da.name] = header_da
     return ds
 
 
+def write_dataset(
+    cine_source: Path,
+    destination: Path,
+    num_frames: int | None = None,
+    start_frame: int = 0,
+    chunk_frames: int = CHUNK_FRAMES,
+):
+    """Stream a CINE to a NetCDF file, holding only one chunk of frames in memory.
+
+    The header and time coordinates are written up front, then frames are read from
+    the CINE and written to a video variable chunked along the frame dimension, one
+    chunk at a time.
+
+    Args:
+        cine_source: CINE to convert.
+        destination: NetCDF file to write.
+        num_frames: Number of frames to convert. Default: All frames.
+        start_frame: Frame to start converting from.
+        chunk_frames: Number of frames to read and write at once.
+    """
+    ds = prepare_dataset(cine_source, num_frames, start_frame, chunk_frames)
+    frames, height, width = ds[VIDEO].shape
+    # Only compute one chunk at a time so that memory use doesn't scale with workers
+    with dask_config.set(scheduler="synchronous"):
+        ds.to_netcdf(
+            path=destination,
+            encoding={
+                VIDEO: {"chunksizes": (min(chunk_frames, frames), height, width)}
+            },
+        )
+
+
+def get_chunked_cine_images(
+    cine_source: Path,
+    num_frames: int,
+    start_frame: int = 0,
+    chunk_frames: int = CHUNK_FRAMES,
+) -> Array:
+    """Lazily get images from a CINE, reading a chunk of frames at a time."""
+    first_image = next(get_cine_images(cine_source, 1, start_frame))
+    return concatenate([
+        from_delayed(
+            delayed(read_cine_chunk)(
+                cine_source,
+                start_frame + chunk.start,
+                chunk.stop - chunk.start,
+                first_image.shape,
+                first_image.dtype,
+            ),
+            shape=(chunk.stop - chunk.start, *first_image.shape),
+            dtype=first_image.dtype,
+        )
+        for chunk in get_frame_chunks(num_frames, chunk_frames)
+    ])
+
+
+def read_cine_chunk(
+    cine_source: Path,
+    start_frame: int,
+    num_frames: int,
+    shape: tuple[int, ...],
+    dtype: DTypeLike,
+) -> Vid:
+    """Read a chunk of frames from a CINE into a preallocated array."""
+    images = empty((num_frames, *shape), dtype)
+    for frame_num, image in enumerate(
+        get_cine_images(cine_source, num_frames, start_frame)
+    ):
+        images[frame_num] = image
+    return images
+
+
 # * -------------------------------------------------------------------------------- * #
 # * SECONDARY LENGTH DIMENSIONS
 
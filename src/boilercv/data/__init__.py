@@ -1,16 +1,25 @@
-"""Tools for datasets."""
+"""Tools for datasets.
+
+Heavy dependencies such as `xarray` are imported on first use, so that modules only
+needing dimension names and other constants are cheap to import.
+"""
+
+from __future__ import annotations
 
 from collections.abc import Callable, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from itertools import chain
-from typing import Any, TypedDict
+from os import cpu_count
+from typing import TYPE_CHECKING, Any, TypedDict
 
-from numpy import full
-from pandas import IndexSlice
-from pytz import timezone
-from xarray import DataArray, Dataset, apply_ufunc
+from numpy import broadcast_shapes, empty, full, ndindex, stack, zeros
 
 from boilercv.data.models import Dimension, get_dims
-from boilercv.types import DA, DS, ArrLike
+from boilercv.types import Arr, ArrLike, Backend
+
+if TYPE_CHECKING:
+    from boilercv.types import DA, DS
 
 VIDEO = "video"
 """Name of the video array in a dataset."""
@@ -18,8 +27,6 @@ ROI = "roi"
 """Name of the ROI array in a dataset."""
 HEADER = "header"
 """Name of the header metadata (attache to an empty array) in a dataset."""
-TIMEZONE = timezone("US/Pacific")
-"""Timezone for all data."""
 
 FRAME = "frame"
 """Frame dimension name."""
@@ -59,13 +66,45 @@ PACKED_DIMS = [FRAME, YPX, XPX_PACKED]
 VIDEO_NAME = "video_name"
 """Dimension for the video name, for datasets with frames from multiple videos."""
 
+CHUNK_FRAMES = 100
+"""Default number of frames to hold in memory when streaming through a video."""
+
 LENGTH = "um"
 """Length dimension units."""
 SAMPLE_DIAMETER_UM = 9_525_000
 """Sample diameter in micrometers."""
 
-islice = IndexSlice
-"""Helper for slicing multi-index dataframes."""
+
+def __getattr__(name: str) -> Any:
+    """Get the data timezone and the multi-index slicing helper on first access.
+
+    `TIMEZONE` is the timezone for all data, and `islice` is a helper for slicing
+    multi-index dataframes.
+    """
+    if name == "TIMEZONE":
+        from pytz import timezone
+
+        globals()[name] = timezone("US/Pacific")
+    elif name == "islice":
+        from pandas import IndexSlice
+
+        globals()[name] = IndexSlice
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return globals()[name]
+
+
+def get_frame_chunks(num_frames: int, chunk_frames: int = CHUNK_FRAMES) -> list[slice]:
+    """Get consecutive slices covering a number of frames in chunks of bounded size.
+
+    Args:
+        num_frames: Total number of frames.
+        chunk_frames: Maximum number of frames in each chunk.
+    """
+    return [
+        slice(start, min(start + chunk_frames, num_frames))
+        for start in range(0, num_frames, chunk_frames)
+    ]
 
 
 def identity_da(da: DA, dim: str) -> DA:
@@ -77,6 +116,8 @@ def identity_da(da: DA, dim: str) -> DA:
         da: Data array.
         dim: The dimension to extract.
     """
+    from xarray import DataArray
+
     return DataArray(dims=(dim), coords={dim: da[dim].values}, data=da[dim])
 
 
@@ -100,8 +141,36 @@ def apply_to_img_da(
     vectorize: bool = False,
     name: Sequence[str] | str = "",
     kwargs: dict[str, Any] | None = None,
+    backend: Backend = "serial",
+    workers: int | None = None,
 ) -> Any:
-    """Apply functions that transform images to transform data arrays instead."""
+    """Apply functions that transform images to transform data arrays instead.
+
+    Args:
+        func: Function that transforms images.
+        *args: Data arrays to pass to the function.
+        returns: Number of images returned by the function.
+        vectorize: Whether to apply the function to each image, e.g. over frames.
+        name: Name or names of the resulting data arrays.
+        kwargs: Keyword arguments for the function.
+        backend: Execution backend for vectorized functions. Threads are suitable for
+            OpenCV functions, which release the GIL.
+        workers: Number of workers for parallel backends. Default: Executor default.
+    """
+    from xarray import apply_ufunc
+
+    # Map over empty videos too, as `numpy.vectorize` can't infer their result types
+    if vectorize and (backend != "serial" or any(arg.size == 0 for arg in args)):
+        func = partial(
+            map_images,
+            func,
+            returns=returns,
+            backend=backend,
+            workers=workers,
+            kwargs=kwargs,
+        )
+        vectorize = False
+        kwargs = None
     core_dims = [YX_PX]
     common_kwargs = CommonKwargs(
         input_core_dims=core_dims * len(args),
@@ -124,6 +193,88 @@ def apply_to_img_da(
         apply_ufunc(func, *args, **common_kwargs)
 
 
+def map_images(
+    func: Callable[..., Any],
+    *imgs: Arr,
+    returns: int | None = 1,
+    backend: Backend = "threads",
+    workers: int | None = None,
+    kwargs: dict[str, Any] | None = None,
+) -> Any:
+    """Map a function over the images in arrays, distributing images across workers.
+
+    Images are in the last two dimensions of each array, and the leading dimensions of
+    all arrays are broadcast together, as in `numpy.vectorize`. Results are stacked in
+    the same order as the images. If there are no images, results are empty, with the
+    image shape and type of the result of the function applied to blank images.
+    Functions returning nothing give `None` for each image, as in `numpy.vectorize`.
+
+    Args:
+        func: Function that transforms images.
+        *imgs: Arrays of images to pass to the function.
+        returns: Number of images returned by the function.
+        backend: Execution backend.
+        workers: Number of workers for parallel backends. Default: Executor default.
+        kwargs: Keyword arguments for the function.
+    """
+    ndim = max(img.ndim for img in imgs)
+    # Align leading dimensions without copying, e.g. for a mask applied to every frame
+    imgs = tuple(img.reshape((1,) * (ndim - img.ndim) + img.shape) for img in imgs)
+    shape = broadcast_shapes(*(img.shape[:-2] for img in imgs))
+    indices = list(ndindex(*shape))
+    if not indices:
+        if not returns:
+            return empty(shape, dtype=object)
+        blank = apply_to_images(
+            func,
+            *(zeros(img.shape[-2:], dtype=img.dtype) for img in imgs),
+            kwargs=kwargs,
+        )
+        if returns == 1:
+            return empty((*shape, *blank.shape), dtype=blank.dtype)
+        return tuple(empty((*shape, *part.shape), dtype=part.dtype) for part in blank)
+    images = (
+        [
+            img[tuple(i % size for i, size in zip(index, img.shape[:-2], strict=True))]
+            for index in indices
+        ]
+        for img in imgs
+    )
+    apply = partial(apply_to_images, func, kwargs=kwargs)
+    if backend == "serial":
+        results = list(map(apply, *images))
+    else:
+        # Send several images to each worker process at once to amortize pickling
+        chunksize = -(-len(indices) // (4 * (workers or cpu_count() or 1)))
+        with get_executor(backend, workers) as executor:
+            results = list(executor.map(apply, *images, chunksize=max(1, chunksize)))
+    if not returns:
+        return full(shape, None, dtype=object)
+    if returns == 1:
+        return stack(results).reshape(*shape, *results[0].shape)
+    return tuple(
+        stack(part).reshape(*shape, *part[0].shape)
+        for part in zip(*results, strict=True)
+    )
+
+
+def apply_to_images(
+    func: Callable[..., Any], *imgs: Arr, kwargs: dict[str, Any] | None = None
+) -> Any:
+    """Apply a function to images with keyword arguments."""
+    return func(*imgs, **(kwargs or {}))
+
+
+def get_executor(backend: Backend, workers: int | None = None) -> Executor:
+    """Get an executor for an execution backend."""
+    if backend == "threads":
+        return ThreadPoolExecutor(max_workers=workers)
+    elif backend == "processes":
+        return ProcessPoolExecutor(max_workers=workers)
+    else:
+        raise ValueError(f"Unknown parallel backend: {backend}")
+
+
 def assign_ds(
     name: str,
     data: ArrLike,
@@ -136,6 +287,8 @@ def assign_ds(
     units: str = "",
 ) -> DS:
     """Build a data array and assign it to a dataset."""
+    from xarray import Dataset
+
     if not ds:
         ds = Dataset()
     da = build_da(
@@ -163,6 +316,8 @@ def build_da(
     units: str = "",
 ):
     """Build a data array."""
+    from xarray import DataArray
+
     all_primary_dims = chain(fixed_dims, dims)
     all_fixed_dims = chain(fixed_dims, fixed_secondary_dims)
     all_variable_dims = chain(dims, secondary_dims)
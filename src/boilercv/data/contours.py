@@ -0,0 +1,187 @@
+"""Contours of the frames of a video, stored as ragged arrays."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from itertools import chain, pairwise
+from operator import index
+from typing import TYPE_CHECKING
+
+from numpy import (
+    append,
+    arange,
+    concatenate,
+    cumsum,
+    empty,
+    flatnonzero,
+    fromiter,
+    int16,
+    int32,
+    int64,
+    repeat,
+    searchsorted,
+)
+
+from boilercv.data import FRAME, YX_PX
+from boilercv.types import ArrInt
+
+if TYPE_CHECKING:
+    from boilercv.types import DF, DS
+
+VERTICES = "vertices"
+"""Name of the contour vertices array in a dataset."""
+CONTOUR_OFFSETS = "contour_offsets"
+"""Name of the array of offsets of each contour into the vertices in a dataset."""
+FRAME_OFFSETS = "frame_offsets"
+"""Name of the array of offsets of each frame into the contour offsets in a dataset."""
+VERTEX = "vertex"
+"""Vertex dimension name."""
+DIM = "dim"
+"""Name of the dimension with coordinates of each pixel length dimension."""
+CONTOUR = "contour"
+"""Contour dimension name."""
+
+
+@dataclass
+class Contours:
+    """Contours of the frames of a video, stored as ragged arrays.
+
+    Vertices of all contours are stacked together. The vertices of contour `c` are
+    `vertices[contour_offsets[c] : contour_offsets[c + 1]]`, and the contours of frame
+    `f` are contours `frame_offsets[f]` up to `frame_offsets[f + 1]`.
+    """
+
+    vertices: ArrInt
+    """Vertices of all contours with dimensions (vertex, dim), e.g. (y, x) pairs."""
+    contour_offsets: ArrInt
+    """Offset of each contour into the vertices, followed by the number of vertices."""
+    frame_offsets: ArrInt
+    """Offset of each frame into the contours, followed by the number of contours."""
+
+    @classmethod
+    def from_frames(cls, contours_per_frame: Sequence[Sequence[ArrInt]]) -> Contours:
+        """Get contours from lists of the contours found in each frame.
+
+        Args:
+            contours_per_frame: Contours in each frame, each with (y, x) vertices.
+        """
+        contours = list(chain.from_iterable(contours_per_frame))
+        frame_offsets = empty(len(contours_per_frame) + 1, dtype=int64)
+        frame_offsets[0] = 0
+        cumsum(
+            fromiter(
+                (len(frame) for frame in contours_per_frame),
+                dtype=int64,
+                count=len(contours_per_frame),
+            ),
+            out=frame_offsets[1:],
+        )
+        contour_offsets = empty(len(contours) + 1, dtype=int64)
+        contour_offsets[0] = 0
+        cumsum(
+            fromiter(
+                (len(contour) for contour in contours), dtype=int64, count=len(contours)
+            ),
+            out=contour_offsets[1:],
+        )
+        vertices = empty((contour_offsets[-1], 2), dtype=int16)
+        if contours:
+            concatenate(contours, out=vertices, casting="same_kind")
+        return cls(vertices, contour_offsets, frame_offsets)
+
+    @classmethod
+    def from_df(cls, df: DF, num_frames: int = 0) -> Contours:
+        """Get contours from a dataframe, such as one from `to_df`.
+
+        Sorts the dataframe once and splits it into contours by offsets, rather than
+        grouping the vertices of each frame by contour.
+
+        Args:
+            df: Dataframe with a multi-index of frame and contour number, and columns
+                "ypx" and "xpx" of vertex pixel locations.
+            num_frames: Number of frames, as frames without contours don't appear in
+                dataframes. Default: Through the last frame with contours.
+        """
+        df = df.sort_index(level=[FRAME, CONTOUR], sort_remaining=False, kind="stable")
+        frames = df.index.get_level_values(FRAME).to_numpy()
+        contours = df.index.get_level_values(CONTOUR).to_numpy()
+        # Each contour starts where the frame or contour number changes
+        changes = (frames[1:] != frames[:-1]) | (contours[1:] != contours[:-1])
+        contour_starts = flatnonzero(concatenate([[len(df) > 0], changes]))
+        num_frames = num_frames or (int(frames[-1]) + 1 if len(df) else 0)
+        return cls(
+            vertices=df[YX_PX].to_numpy(dtype=int16),
+            contour_offsets=append(contour_starts, len(df)).astype(int64),
+            frame_offsets=searchsorted(
+                frames[contour_starts], arange(num_frames + 1)
+            ).astype(int64),
+        )
+
+    @classmethod
+    def from_dataset(cls, ds: DS) -> Contours:
+        """Get contours from a dataset, such as one from `to_dataset`."""
+        return cls(
+            ds[VERTICES].values, ds[CONTOUR_OFFSETS].values, ds[FRAME_OFFSETS].values
+        )
+
+    def to_dataset(self) -> DS:
+        """Get a dataset of contours, e.g. for writing to disk."""
+        from xarray import Dataset
+
+        return Dataset(
+            {
+                VERTICES: ((VERTEX, DIM), self.vertices),
+                CONTOUR_OFFSETS: (CONTOUR_OFFSETS, self.contour_offsets),
+                FRAME_OFFSETS: (FRAME_OFFSETS, self.frame_offsets),
+            },
+            coords={DIM: YX_PX},
+        )
+
+    def to_df(self) -> DF:
+        """Get a dataframe of contours, with a multi-index of frame and contour number.
+
+        Columns "ypx" and "xpx" indicate the pixel locations of contour vertices.
+        """
+        from pandas import DataFrame
+
+        contours_in_frames = self.frame_offsets[1:] - self.frame_offsets[:-1]
+        contour_lengths = self.contour_offsets[1:] - self.contour_offsets[:-1]
+        # Number each contour within its frame by offsetting from the frame's first
+        contour_nums = arange(len(contour_lengths), dtype=int32) - repeat(
+            self.frame_offsets[:-1], contours_in_frames
+        ).astype(int32)
+        frame_nums = repeat(arange(len(self), dtype=int32), contours_in_frames)
+        return DataFrame({
+            FRAME: repeat(frame_nums, contour_lengths),
+            CONTOUR: repeat(contour_nums, contour_lengths),
+            **{dim: self.vertices[:, i].astype(int32) for i, dim in enumerate(YX_PX)},
+        }).set_index([FRAME, CONTOUR])
+
+    def __len__(self) -> int:
+        """Get the number of frames."""
+        return len(self.frame_offsets) - 1
+
+    def __getitem__(self, frame: int) -> list[ArrInt]:
+        """Get views of the vertices of each contour in a frame.
+
+        Builds a list of views of each contour in the frame. Prefer `get_frame_vertices`
+        when handling many frames.
+        """
+        vertices, offsets = self.get_frame_vertices(frame)
+        return [vertices[start:stop] for start, stop in pairwise(offsets)]
+
+    def get_frame_vertices(self, frame: int) -> tuple[ArrInt, ArrInt]:
+        """Get a view of the vertices in a frame, and offsets of its contours into them.
+
+        Args:
+            frame: Frame number, which may be negative to count from the last frame.
+        """
+        frame = index(frame)
+        if not -len(self) <= frame < len(self):
+            raise IndexError(f"Frame {frame} out of range for {len(self)} frames.")
+        frame %= len(self)
+        offsets = self.contour_offsets[
+            self.frame_offsets[frame] : self.frame_offsets[frame + 1] + 1
+        ]
+        return self.vertices[offsets[0] : offsets[-1]], offsets - offsets[0]
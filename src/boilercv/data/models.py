@@ -1,9 +1,14 @@
 """Models for image processing."""
 
+from __future__ import annotations
+
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+from boilercv.types import SupportsMul
 
-from boilercv.types import DA, SupportsMul
+if TYPE_CHECKING:
+    from boilercv.types import DA
 
 
 @dataclass
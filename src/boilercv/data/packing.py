@@ -1,50 +1,173 @@
-"""Packing and unpacking of binarized video data."""
+"""Packing and unpacking of binarized video data.
 
-from numpy import packbits, unpackbits
-from xarray import apply_ufunc
+Bits are packed along the last image dimension, so videos may be chunked along any
+other dimension, such as frames, and are packed and unpacked one chunk at a time.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from numpy import (
+    arange,
+    bitwise_or,
+    empty,
+    int64,
+    packbits,
+    take,
+    uint8,
+    unpackbits,
+    zeros,
+)
 
 from boilercv.data import (
-    DIMS,
+    CHUNK_FRAMES,
     PACKED,
-    PACKED_DIM_INDEX,
-    PACKED_DIMS,
     VIDEO,
     XPX,
     XPX_PACKED,
+    YPX,
+    get_frame_chunks,
 )
-from boilercv.types import DA
+from boilercv.types import ArrInt, ImgBool, Vid, VidBool
+
+if TYPE_CHECKING:
+    from boilercv.types import DA
+
+BYTE_BITS = unpackbits(arange(256, dtype=uint8)[:, None], axis=1).view(bool)
+"""Bits of each possible byte value, indexed by byte value."""
+BYTE_POPCOUNTS = BYTE_BITS.sum(axis=1, dtype=uint8)
+"""Number of set bits in each possible byte value, indexed by byte value."""
 
 
 def pack(da: DA) -> DA:
     """Pack the bits in dimension of the data array."""
-    return (
-        apply_ufunc(
-            packbits,
-            da,
-            kwargs=dict(axis=PACKED_DIM_INDEX),
-            input_core_dims=[DIMS],
-            output_core_dims=[DIMS],
-            exclude_dims={XPX},
-            keep_attrs=True,
-        )
-        .rename({XPX: XPX_PACKED})
-        .rename(f"{VIDEO}_{PACKED}")
-    )
+    return pack_with(packbits, da, kwargs=dict(axis=-1))
+
+
+def pack_with(
+    func: Callable[..., Any], da: DA, kwargs: dict[str, Any] | None = None
+) -> DA:
+    """Pack the bits of a data array with a function that returns packed bits.
+
+    Produces the same layout as `pack`. Useful for functions that produce packed bits
+    directly, such as `boilercv.images.cv.binarize_and_pack`.
+
+    Args:
+        func: Function taking images and returning their bits packed along x.
+        da: Data array to pass to the function.
+        kwargs: Keyword arguments for the function.
+    """
+    from xarray import apply_ufunc
+
+    return apply_ufunc(
+        func,
+        da,
+        kwargs=kwargs,
+        input_core_dims=[[YPX, XPX]],
+        output_core_dims=[[YPX, XPX_PACKED]],
+        exclude_dims={XPX},
+        keep_attrs=True,
+        dask="parallelized",
+        dask_gufunc_kwargs=dict(output_sizes={XPX_PACKED: -(-da.sizes[XPX] // 8)}),
+        output_dtypes=[uint8],
+    ).rename(f"{VIDEO}_{PACKED}")
 
 
 def unpack(da: DA) -> DA:
     """Unpack the bits of the last image dimension of a data array."""
-    return (
-        apply_ufunc(
-            unpackbits,
-            da,
-            kwargs=dict(axis=PACKED_DIM_INDEX),
-            input_core_dims=[PACKED_DIMS],
-            output_core_dims=[PACKED_DIMS],
-            exclude_dims={XPX_PACKED},
-            keep_attrs=True,
-        )
-        .rename({XPX_PACKED: XPX})
-        .rename(VIDEO)
-        .astype(bool)
-    )
+    from xarray import apply_ufunc
+
+    return apply_ufunc(
+        unpack_bits,
+        da,
+        input_core_dims=[[YPX, XPX_PACKED]],
+        output_core_dims=[[YPX, XPX]],
+        exclude_dims={XPX_PACKED},
+        keep_attrs=True,
+        dask="parallelized",
+        dask_gufunc_kwargs=dict(output_sizes={XPX: 8 * da.sizes[XPX_PACKED]}),
+        output_dtypes=[bool],
+    ).rename(VIDEO)
+
+
+def unpack_bits(packed: Vid) -> VidBool:
+    """Unpack bits along the last dimension, viewing the result as booleans."""
+    # Unpacked bits are zero or one, so viewing them as booleans avoids a copy
+    return unpackbits(packed, axis=-1).view(bool)
+
+
+@dataclass
+class PackedVideo:
+    """A bit-packed video, decoded one frame at a time, with reductions over bytes.
+
+    Wraps packed bits, e.g. from `pack`, without copying them, so that the packed bits
+    may be memory-mapped. Frames are decoded into a reusable buffer, and reductions
+    over frames operate on packed bytes directly where possible.
+
+    Args:
+        packed: Video with bits packed along x, with dimensions (frame, y, x_packed).
+        width: Width of unpacked frames. Default: All unpacked bits.
+    """
+
+    packed: Vid
+    """Video with bits packed along x, with dimensions (frame, y, x_packed)."""
+    width: int = 0
+    """Width of unpacked frames. Default: All unpacked bits."""
+    buffer: ImgBool = field(init=False, repr=False)
+    """Reusable buffer for decoded frames."""
+
+    def __post_init__(self):
+        _, height, packed_width = self.packed.shape
+        self.width = self.width or 8 * packed_width
+        self.buffer = empty((height, packed_width, 8), dtype=bool)
+
+    @classmethod
+    def from_da(cls, da: DA, width: int = 0) -> PackedVideo:
+        """Wrap the packed bits of a data array, such as one from `pack`."""
+        return cls(da.transpose(..., YPX, XPX_PACKED).values, width)
+
+    def __len__(self) -> int:
+        return len(self.packed)
+
+    def __getitem__(self, frame: int) -> ImgBool:
+        """Decode a frame into the buffer, which the next decoded frame overwrites."""
+        take(BYTE_BITS, self.packed[frame], axis=0, out=self.buffer)
+        return self.buffer.reshape(len(self.buffer), -1)[:, : self.width]
+
+    def __iter__(self) -> Iterator[ImgBool]:
+        """Decode each frame in turn into the buffer."""
+        for frame in range(len(self)):
+            yield self[frame]
+
+    def select(self, frames: slice) -> PackedVideo:
+        """Select frames without copying their packed bits."""
+        return PackedVideo(self.packed[frames], self.width)
+
+    def max(self) -> ImgBool:
+        """Get the maximum of each pixel over all frames."""
+        return self.any()
+
+    def any(self) -> ImgBool:
+        """Get whether each pixel is set in any frame, by OR-ing packed bytes."""
+        return unpack_bits(bitwise_or.reduce(self.packed, axis=0))[:, : self.width]
+
+    def sum(self, chunk_frames: int = CHUNK_FRAMES) -> ArrInt:
+        """Get the number of frames in which each pixel is set."""
+        _, height, _ = self.packed.shape
+        counts = zeros((height, self.width), dtype=int64)
+        for chunk in get_frame_chunks(len(self), chunk_frames):
+            counts += unpack_bits(self.packed[chunk])[..., : self.width].sum(axis=0)
+        return counts
+
+    def counts(self, chunk_frames: int = CHUNK_FRAMES) -> ArrInt:
+        """Get the number of set pixels in each frame, by counting set bits in bytes."""
+        counts = empty(len(self), dtype=int64)
+        # Padding bits are always unset, so they don't contribute to counts
+        for chunk in get_frame_chunks(len(self), chunk_frames):
+            counts[chunk] = BYTE_POPCOUNTS[self.packed[chunk]].sum(
+                axis=(1, 2), dtype=int64
+            )
+        return counts
@@ -3,15 +3,39 @@
 # * Pure numpy image processing functions take lots of types, including DataArrays.
 # pyright: reportGeneralTypeIssues=none
 
-from typing import Any
-
-from matplotlib.font_manager import FontProperties, findfont
-from numpy import asarray, iinfo, invert, mean, uint8
+from __future__ import annotations
+
+from collections.abc import Sequence
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from numpy import (
+    arange,
+    array,
+    asarray,
+    broadcast_arrays,
+    empty,
+    iinfo,
+    int32,
+    invert,
+    left_shift,
+    mean,
+    ndindex,
+    take,
+    uint8,
+    uint16,
+    uint32,
+    zeros,
+)
 from numpy.typing import DTypeLike
-from PIL import Image, ImageDraw, ImageFont, ImageOps
 
 from boilercv.colors import BLACK, BLACK3, RED, WHITE, WHITE3
-from boilercv.types import DA_T, Img, ImgLike
+from boilercv.types import ArrInt, Img, ImgLike, Vid
+
+if TYPE_CHECKING:
+    from PIL.ImageFont import FreeTypeFont
+
+    from boilercv.types import DA_T
 
 # * -------------------------------------------------------------------------------- * #
 # * PURE NUMPY - TYPE PRESERVING
@@ -46,10 +70,25 @@ def scale_bool(img: Any, dtype: DTypeLike = uint8) -> Any:
 # * -------------------------------------------------------------------------------- * #
 # * OTHER - NOT ALWAYS TYPE PRESERVING
 
-FONT = ImageFont.truetype(findfont(FontProperties(family="dejavu sans")), 24)
 PAD = 10
 
 
+@cache
+def get_font() -> FreeTypeFont:
+    """Get the font for drawing text, finding and loading it on first use."""
+    from matplotlib.font_manager import FontProperties, findfont
+    from PIL import ImageFont
+
+    return ImageFont.truetype(findfont(FontProperties(family="dejavu sans")), 24)
+
+
+def __getattr__(name: str) -> Any:
+    """Get the font for drawing text as `FONT` on first access."""
+    if name == "FONT":
+        return get_font()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def draw_text(image: Img, text: str = "") -> ImgLike:
     """Draw text in the top-right corner of an image.
 
@@ -57,6 +96,8 @@ def draw_text(image: Img, text: str = "") -> ImgLike:
         image: Image.
         text: Text to draw.
     """
+    from PIL import Image, ImageDraw
+
     if image.ndim == 3:
         rectangle_fill = BLACK3
         font_fill = WHITE3
@@ -65,16 +106,54 @@ def draw_text(image: Img, text: str = "") -> ImgLike:
         font_fill = WHITE
     _, image_width = image.shape[:2]
     pil_image = Image.fromarray(image)
-    _, _, font_bbox_width, font_bbox_height = FONT.getbbox(text)
+    font = get_font()
+    _, _, font_bbox_width, font_bbox_height = font.getbbox(text)
     text_p0 = (image_width - PAD - font_bbox_width, PAD)
     p0 = (text_p0[0] - PAD, text_p0[1] - PAD)
     p1 = (text_p0[0] + PAD + font_bbox_width, text_p0[1] + PAD + font_bbox_height)
     draw = ImageDraw.Draw(pil_image)
     draw.rectangle((p0, p1), fill=rectangle_fill)  # type: ignore  # pyright 1.1.348, pillow 10.2.0
-    draw.text(text_p0, text, font=FONT, fill=font_fill)  # type: ignore  # pyright 1.1.348, pillow 10.2.0
+    draw.text(text_p0, text, font=font, fill=font_fill)  # type: ignore  # pyright 1.1.348, pillow 10.2.0
     return asarray(pil_image)
 
 
+def draw_text_video(images: Vid, texts: Sequence[str]) -> Vid:
+    """Draw text in the top-right corner of each image, as in `draw_text`.
+
+    Text is rendered once for each distinct string and stamped onto images by slicing,
+    rather than drawing onto each image separately.
+
+    Args:
+        images: Images with dimensions (frame, y, x) or (frame, y, x, channel).
+        texts: Text to draw on each image.
+    """
+    drawn = images.copy()
+    width = images.shape[2]
+    for image, text in zip(drawn, texts, strict=True):
+        patch = get_text_patch(str(text))
+        left = width - patch.shape[1] + 1
+        # The rectangle behind the text extends one pixel past the right edge
+        patch = patch[:, max(0, -left) : patch.shape[1] - 1]
+        if image.ndim == 3:
+            patch = patch[..., None]
+        image[: patch.shape[0], max(0, left) :] = patch[: image.shape[0]]
+    return drawn
+
+
+@cache
+def get_text_patch(text: str) -> Img:
+    """Get text drawn on its background rectangle, as drawn by `draw_text`."""
+    from PIL import Image, ImageDraw
+
+    font = get_font()
+    _, _, font_bbox_width, font_bbox_height = font.getbbox(text)
+    patch = Image.new(
+        "L", (font_bbox_width + 2 * PAD + 1, font_bbox_height + 2 * PAD + 1), BLACK
+    )
+    ImageDraw.Draw(patch).text((PAD, PAD), text, font=font, fill=WHITE)
+    return asarray(patch)
+
+
 def overlay(
     image: ImgLike, overlay: Img, color: tuple[int, int, int] = RED, alpha: float = 0.3
 ) -> Img:
@@ -86,6 +165,8 @@ def overlay(
         color: Color for the overlay.
         alpha: Alpha value for the overlay. Range: 0-1
     """
+    from PIL import Image, ImageOps
+
     background = Image.fromarray(image).convert("RGBA")  # pyright: ignore[reportArgumentType] 1.1.356, pillow 10.0.0
     objects = Image.fromarray(overlay)
     if overlay.ndim == 2:
@@ -96,3 +177,60 @@ def overlay(
         mask = Image.fromarray(invert(avg.astype(bool) * alpha).astype(uint8))
     composite = Image.composite(background, objects, mask)
     return asarray(composite)
+
+
+def overlay_video(
+    images: Vid, overlays: Vid, color: tuple[int, int, int] = RED, alpha: float = 0.3
+) -> Vid:
+    """Color grayscale images given single-channel overlays, as in `overlay`.
+
+    Colors each pixel by looking up its pair of image and overlay values in a table,
+    built once for each color and alpha. Images and overlays are broadcast together,
+    e.g. to apply one overlay to every image.
+
+    Args:
+        images: Grayscale or binarized images.
+        overlays: Single-channel overlay images, such as scaled booleans.
+        color: Color for the overlay.
+        alpha: Alpha value for the overlay. Range: 0-1
+    """
+    if images.dtype == bool:
+        images = scale_bool(images)
+    images, overlays = broadcast_arrays(images, overlays)
+    lut = get_overlay_lut(color, alpha)
+    # Look up colors as 32-bit pixels, then view them as their first three channels
+    composite = empty((*images.shape, 4), dtype=uint8)
+    composite_pixels = composite.view(uint32).reshape(images.shape)
+    index = empty(images.shape[-2:], dtype=uint16)
+    for img in ndindex(images.shape[:-2]):
+        left_shift(images[img], 8, out=index, dtype=uint16)
+        index |= overlays[img]
+        take(lut, index, out=composite_pixels[img])
+    return composite[..., :3]
+
+
+@cache
+def get_overlay_lut(color: tuple[int, int, int], alpha: float) -> ArrInt:
+    """Get the color of each pair of image and overlay values, as 32-bit pixels.
+
+    Pixels are indexed by image value times 256 plus overlay value, and are colored as
+    `overlay` would color them.
+
+    Args:
+        color: Color for the overlay.
+        alpha: Alpha value for the overlay. Range: 0-1
+    """
+    values = arange(256, dtype=uint16)
+    # Colorize overlays from white to the color, as does `PIL.ImageOps.colorize`
+    white = array(WHITE3, dtype=int32)
+    colors = (white + values[:, None] * (array(color) - white) // 255).astype(uint16)
+    masks = (~(values * alpha).astype(uint8)).astype(uint16)[:, None]
+    # Blend with the rounding of `PIL.Image.composite`
+    blended = (
+        colors[None, :, :] * (WHITE - masks[None, :, :])
+        + values[:, None, None] * masks[None, :, :]
+        + 128
+    )
+    lut = zeros((256, 256, 4), dtype=uint8)
+    lut[..., :3] = (blended + (blended >> 8)) >> 8
+    return lut.view(uint32).reshape(-1)
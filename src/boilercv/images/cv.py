@@ -1,8 +1,10 @@
 """Process images with OpenCV."""
 
 from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
+from functools import partial
 
 from cv2 import (
     ADAPTIVE_THRESH_MEAN_C,
@@ -37,11 +39,24 @@ from cv2 import (
     getStructuringElement,
     morphologyEx,
 )
-from numpy import array, flip, fliplr, iinfo, zeros_like
+from numpy import (
+    array,
+    empty,
+    flip,
+    fliplr,
+    iinfo,
+    int32,
+    packbits,
+    split,
+    uint8,
+    zeros_like,
+)
 
 from boilercv.colors import WHITE, WHITE3
+from boilercv.data import CHUNK_FRAMES
+from boilercv.data.contours import Contours
 from boilercv.images import unpad
-from boilercv.types import ArrFloat, ArrInt, Img, ImgBool
+from boilercv.types import ArrFloat, ArrInt, Img, ImgBool, Vid, VidBool
 
 
 def convert_image(img: Img, code: int | None = None) -> Img:
@@ -95,6 +110,104 @@ def binarize(img: Img, block_size: int = 11, thresh_dist_from_mean: int = 2) ->
     ).astype(bool)
 
 
+def binarize_video(
+    video: Vid,
+    block_size: int = 11,
+    thresh_dist_from_mean: int = 2,
+    out: VidBool | None = None,
+    workers: int = 1,
+) -> VidBool:
+    """Binarize a video with an adaptive threshold.
+
+    Identical to `binarize` applied to each frame, but thresholds each frame directly
+    into a preallocated boolean output. OpenCV releases the GIL, so frames may be
+    thresholded in multiple threads.
+
+    Args:
+        video: Video with dimensions (frame, y, x).
+        block_size: Size of the neighborhood used to get the local mean.
+        thresh_dist_from_mean: Constant subtracted from the local mean.
+        out: Preallocated, contiguous boolean output the same shape as the video.
+        workers: Number of threads to threshold frames in.
+    """
+    out = empty(video.shape, dtype=bool) if out is None else out
+    binarize_frames_ = partial(
+        binarize_frames,
+        video,
+        out,
+        block_size=block_size,
+        thresh_dist_from_mean=thresh_dist_from_mean,
+    )
+    if workers == 1:
+        binarize_frames_(slice(None))
+        return out
+    with ThreadPoolExecutor(workers) as executor:
+        frames = [slice(start, None, workers) for start in range(workers)]
+        list(executor.map(binarize_frames_, frames))
+    return out
+
+
+def binarize_and_pack(
+    video: Vid,
+    block_size: int = 11,
+    thresh_dist_from_mean: int = 2,
+    chunk_frames: int = CHUNK_FRAMES,
+    workers: int = 1,
+) -> Vid:
+    """Binarize a video with an adaptive threshold and pack the bits along x.
+
+    Identical to packing the bits of `binarize_video` along the last dimension, but
+    frames are binarized a chunk at a time into a reusable buffer and packed right
+    away, so the boolean video, eight times larger than the result, never exists.
+
+    Args:
+        video: Video with dimensions (frame, y, x).
+        block_size: Size of the neighborhood used to get the local mean.
+        thresh_dist_from_mean: Constant subtracted from the local mean.
+        chunk_frames: Number of frames to binarize at once.
+        workers: Number of threads to threshold frames in.
+    """
+    frames, height, width = video.shape
+    packed = empty((frames, height, -(-width // 8)), dtype=uint8)
+    buffer = empty((min(chunk_frames, frames), height, width), dtype=bool)
+    for start in range(0, frames, chunk_frames):
+        chunk = slice(start, min(start + chunk_frames, frames))
+        packed[chunk] = packbits(
+            binarize_video(
+                video[chunk],
+                block_size,
+                thresh_dist_from_mean,
+                out=buffer[: chunk.stop - chunk.start],
+                workers=workers,
+            ),
+            axis=-1,
+        )
+    return packed
+
+
+def binarize_frames(
+    video: Vid,
+    out: VidBool,
+    frames: slice,
+    block_size: int = 11,
+    thresh_dist_from_mean: int = 2,
+):
+    """Binarize a slice of frames of a video into a boolean output in place."""
+    block_size += 1 if block_size % 2 == 0 else 0
+    # Thresholding to a maximum value of one writes booleans without copying
+    out_uint8 = out.view(uint8)
+    for frame in range(*frames.indices(len(video))):
+        adaptiveThreshold(
+            src=video[frame],
+            maxValue=1,
+            adaptiveMethod=ADAPTIVE_THRESH_MEAN_C,
+            thresholdType=THRESH_BINARY,
+            blockSize=block_size,
+            C=thresh_dist_from_mean,
+            dst=out_uint8[frame],
+        )
+
+
 def flood(img: Img) -> ImgBool:
     """Flood the image, returning the resulting flood as a bright mask."""
     seed_point = array(img.shape) // 2
@@ -166,8 +279,11 @@ def transform(img: Img, transforms: Transform | Sequence[Transform]) -> Img:
 
 def build_mask_from_polygons(img: Img, contours: Sequence[ArrInt]) -> Img:
     """Build a mask from the intersection of a sequence of polygonal contours."""
-    # OpenCV expects contours as shape (N, 1, 2) instead of (N, 2)
-    contours = [fliplr(contour).reshape(-1, 1, 2) for contour in contours]
+    # OpenCV expects int32 contours as shape (N, 1, 2) instead of (N, 2)
+    contours = [
+        fliplr(contour).reshape(-1, 1, 2).astype(int32, copy=False)
+        for contour in contours
+    ]
     blank = zeros_like(img)
     return fillPoly(  # type: ignore  # pyright 1.1.333
         img=blank,
@@ -197,8 +313,11 @@ def draw_contours(
     color: int | tuple[int, ...] = WHITE,
 ) -> Img:
     """Draw contours on an image."""
-    # OpenCV expects contours as shape (N, 1, 2) instead of (N, 2)
-    contours = [fliplr(contour).reshape(-1, 1, 2) for contour in contours]
+    # OpenCV expects int32 contours as shape (N, 1, 2) instead of (N, 2)
+    contours = [
+        fliplr(contour).reshape(-1, 1, 2).astype(int32, copy=False)
+        for contour in contours
+    ]
     return drawContours(
         image=img,
         contours=contours,
@@ -208,6 +327,80 @@ def draw_contours(
     )
 
 
+def draw_frame_contours(
+    img: Img,
+    vertices: ArrInt,
+    offsets: ArrInt,
+    thickness: int = FILLED,
+    color: int | tuple[int, ...] = WHITE,
+) -> Img:
+    """Draw contours on an image, given their vertices and offsets into them.
+
+    Converts the vertices of all contours at once, rather than each contour in turn.
+
+    Args:
+        img: Image to draw on.
+        vertices: Vertices of all contours, e.g. from `Contours.get_frame_vertices`.
+        offsets: Offset of each contour into the vertices, followed by their number.
+        thickness: Thickness of contour outlines. Default: Fill contours.
+        color: Color to draw contours in.
+    """
+    # OpenCV expects int32 contours as shape (N, 1, 2) instead of (N, 2)
+    vertices = fliplr(vertices).astype(int32).reshape(-1, 1, 2)
+    return drawContours(
+        image=img,
+        contours=split(vertices, offsets[1:-1]),
+        contourIdx=-1,
+        color=color,  # type: ignore  # pyright 1.1.333
+        thickness=thickness,
+    )
+
+
+def fill_contours(
+    contours: Contours | Sequence[Sequence[ArrInt]],
+    out: Vid,
+    workers: int = 1,
+    first_frame: int = 0,
+) -> Vid:
+    """Fill contours in each frame of a video.
+
+    Clears a preallocated output, then fills contours directly into its frames. OpenCV
+    releases the GIL, so frames may be filled in multiple threads.
+
+    Args:
+        contours: Contours in each frame.
+        out: Preallocated, contiguous output with a frame for each frame of contours
+            from the first.
+        workers: Number of threads to fill frames in.
+        first_frame: Frame of the contours to fill into the first frame of the output.
+    """
+    out[:] = 0
+    fill_frames_ = partial(fill_frames, contours, out, first_frame=first_frame)
+    if workers == 1:
+        fill_frames_(slice(None))
+        return out
+    with ThreadPoolExecutor(workers) as executor:
+        frames = [slice(start, None, workers) for start in range(workers)]
+        list(executor.map(fill_frames_, frames))
+    return out
+
+
+def fill_frames(
+    contours: Contours | Sequence[Sequence[ArrInt]],
+    out: Vid,
+    frames: slice,
+    first_frame: int = 0,
+):
+    """Fill contours in some frames of a video in-place."""
+    for frame in range(len(out))[frames]:
+        if isinstance(contours, Contours):
+            draw_frame_contours(
+                out[frame], *contours.get_frame_vertices(first_frame + frame)
+            )
+        else:
+            draw_contours(out[frame], contours[first_frame + frame])
+
+
 def find_line_segments(img: Img) -> tuple[ArrFloat, LineSegmentDetector]:
     """Find line segments in an image."""
     lsd = createLineSegmentDetector()
@@ -1,18 +1,45 @@
-"""Types relevant to array manipulation and image processing."""
+"""Types relevant to array manipulation and image processing.
 
-from typing import Any, Protocol, TypeAlias, TypeVar
+Types from `pandas` and `xarray` are imported on first access at runtime, so that
+modules only needing them in annotations don't import them.
+"""
+
+from typing import TYPE_CHECKING, Any, Literal, Protocol, TypeAlias, TypeVar
 
 from numpy import bool_, datetime64, floating, generic, integer, number, timedelta64
 from numpy.typing import ArrayLike, NBitBase, NDArray
-from pandas import DataFrame, Series
-from xarray import DataArray, Dataset
 
-DF: TypeAlias = DataFrame
-DA: TypeAlias = DataArray
-DS: TypeAlias = Dataset
-DfOrS: TypeAlias = DataFrame | Series  # type: ignore  # pyright 1.1.333
+if TYPE_CHECKING:
+    from pandas import DataFrame, Series
+    from xarray import DataArray, Dataset
+
+    DF: TypeAlias = DataFrame
+    DA: TypeAlias = DataArray
+    DS: TypeAlias = Dataset
+    DfOrS: TypeAlias = DataFrame | Series  # type: ignore  # pyright 1.1.333
+
+    DA_T = TypeVar("DA_T", bound=DA)
+
 
-DA_T = TypeVar("DA_T", bound=DA)
+def __getattr__(name: str) -> Any:
+    """Get types from `pandas` and `xarray` on first access, importing them lazily."""
+    if name in {"DF", "DfOrS"}:
+        from pandas import DataFrame, Series
+
+        types: dict[str, Any] = {"DF": DataFrame, "DfOrS": DataFrame | Series}
+    elif name in {"DA", "DS", "DA_T"}:
+        from xarray import DataArray, Dataset
+
+        types = {
+            "DA": DataArray,
+            "DS": Dataset,
+            "DA_T": TypeVar("DA_T", bound=DataArray),
+        }
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Cache the types so they are only imported once
+    globals().update({k: v for k, v in types.items() if k not in globals()})
+    return globals()[name]
 
 
 class SupportsMul(Protocol):
@@ -63,3 +90,6 @@ Vid: TypeAlias = Img
 
 VidBool: TypeAlias = ImgBool
 """A boolean array representing a video mask."""
+
+Backend: TypeAlias = Literal["serial", "threads", "processes"]
+"""Execution backend for mapping functions over the frames of a video."""
@@ -19,9 +19,15 @@ from boilercore.notebooks.namespaces import get_nb_ns, get_ns_attrs
 from boilercore.testing import get_session_path
 from matplotlib.axis import Axis
 from matplotlib.figure import Figure
+from numpy import ones
+from xarray import Dataset
 
 import boilercv
-from boilercv_tests import Case, get_cached_nb_ns, normalize_cases
+from boilercv.data import ROI, YX_PX
+from boilercv_pipeline import sets, video
+from boilercv_pipeline.manual import convert
+from boilercv_tests import Case, get_cached_nb_ns, normalize_cases, pipeline
+from boilercv_tests.pipeline import BINARIZED, NAME, PATHS
 from boilercv_tests.types import FixtureStore
 
 CASER = "C"
@@ -196,6 +202,37 @@ def ax(fig_ax) -> Axis:
     return fig_ax[1]
 
 
+# * -------------------------------------------------------------------------------- * #
+# * Pipeline
+
+
+@pytest.fixture()
+def paths(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[SimpleNamespace]:
+    """Pipeline paths in a temporary directory, with an ROI for the test video."""
+    paths = SimpleNamespace(**{name: tmp_path / name for name in PATHS})
+    for path in vars(paths).values():
+        path.mkdir()
+    monkeypatch.setattr(sets, "get_params", lambda: SimpleNamespace(paths=paths))
+    Dataset({ROI: (YX_PX, ones(BINARIZED.shape[1:], dtype=bool))}).to_netcdf(
+        paths.rois / f"{NAME}.nc"
+    )
+    sets.get_all_stems.cache_clear()
+    yield paths
+    sets.get_all_stems.cache_clear()
+    sets.DATASET_CACHE.clear()
+
+
+@pytest.fixture()
+def cine(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Test CINE, read by the pipeline in place of CINEs from the camera."""
+    for module in (video, convert):
+        for name in ("get_cine_images", "get_cine_attributes"):
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, getattr(pipeline, name))
+    (path := tmp_path / "Y20220106H152034.cine").touch()
+    return path
+
+
 # * -------------------------------------------------------------------------------- * #
 # * Harvest hooks
 # *   https://github.com/smarie/python-pytest-harvest/issues/46#issuecomment-742367746
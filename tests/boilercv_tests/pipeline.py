@@ -0,0 +1,71 @@
+"""Helpers for tests of the pipeline."""
+
+from dataclasses import dataclass
+from datetime import tzinfo
+from pathlib import Path
+
+from numpy import arange, datetime64, packbits, timedelta64, uint16
+from numpy.random import default_rng
+from xarray import Dataset
+
+from boilercv.data import FRAME, HEADER, VIDEO, XPX, XPX_PACKED, YPX
+
+RNG = default_rng(0)
+NAME = "2022-01-06T15-20-34"
+"""Name of the test video."""
+BINARIZED = RNG.integers(0, 2, (12, 40, 64), dtype=bool)
+"""Random binarized video."""
+CINE = RNG.integers(0, 4096, (12, 40, 64), dtype=uint16)
+"""Random video read from the test CINE."""
+UTC = datetime64("2022-01-06T15:20:34", "ns") + arange(len(CINE)) * timedelta64(
+    100_000, "ns"
+)
+"""Timestamps of frames in the test CINE."""
+PATHS = [
+    "cines",
+    "contours",
+    "examples",
+    "filled",
+    "large_sources",
+    "media",
+    "rois",
+    "sources",
+    "uncompressed_contours",
+    "uncompressed_filled",
+    "uncompressed_sources",
+]
+"""Paths of pipeline datasets used in tests."""
+
+
+def write_source(destination: Path, encoding: dict | None = None):
+    """Write the test video as a packed source."""
+    frames, height, width = BINARIZED.shape
+    Dataset(
+        {VIDEO: ((FRAME, YPX, XPX_PACKED), packbits(BINARIZED, axis=-1)), HEADER: 0.0},
+        coords={FRAME: arange(frames), YPX: arange(height), XPX: arange(width)},
+    ).to_netcdf(destination, encoding={VIDEO: encoding or {}})
+
+
+@dataclass
+class CineHeader:
+    """Header of the test CINE."""
+
+    ExposureTime: int = 100
+    TriggerTime: str = "2022-01-06T15:20:34"
+
+
+def get_cine_images(
+    cine_file: Path, num_frames: int | None = None, start_frame: int = 0
+):
+    """Get images from the test CINE."""
+    yield from CINE[start_frame:][:num_frames]
+
+
+def get_cine_attributes(
+    cine_file: Path,
+    timezone: tzinfo,
+    num_frames: int | None = None,
+    start_frame: int = 0,
+):
+    """Get the header and frame timestamps of the test CINE."""
+    return CineHeader(), UTC[start_frame:][:num_frames]
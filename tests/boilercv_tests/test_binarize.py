@@ -0,0 +1,36 @@
+"""Tests for binarizing videos."""
+
+from numpy import arange, uint8, where, zeros
+from numpy.random import default_rng
+from xarray import Dataset, open_dataset
+
+from boilercv.data import FRAME, ROI, VIDEO, XPX, YPX, apply_to_img_da
+from boilercv.data.packing import pack
+from boilercv.images import scale_bool
+from boilercv.images.cv import apply_mask, binarize, close_and_erode, flood
+from boilercv_pipeline.manual.binarize import binarize_dataset
+
+RNG = default_rng(0)
+GRAY = zeros((12, 60, 80), dtype=uint8)
+GRAY[:, 10:50, 10:70] = where(RNG.random((12, 40, 60)) < 0.1, 50, 200)
+"""Grayscale video with a bright region of interest and dark spots in it."""
+
+
+def test_binarize_dataset(tmp_path):
+    """Binarizing in chunks gives the ROI and video of binarizing all at once."""
+    frames, height, width = GRAY.shape
+    Dataset(
+        {VIDEO: ((FRAME, YPX, XPX), GRAY)},
+        coords={FRAME: arange(frames), YPX: arange(height), XPX: arange(width)},
+    ).to_netcdf(source := tmp_path / "source.nc")
+    destination, roi_destination = tmp_path / "binarized.nc", tmp_path / "roi.nc"
+    binarize_dataset(source, destination, roi_destination, chunk_frames=5)
+    with open_dataset(source) as ds:
+        video = ds[VIDEO].load()
+    flooded = apply_to_img_da(flood, video.max(FRAME))
+    roi = apply_to_img_da(close_and_erode, scale_bool(flooded))
+    masked = apply_to_img_da(apply_mask, video, scale_bool(roi), vectorize=True)
+    expected = pack(apply_to_img_da(binarize, masked, vectorize=True))
+    with open_dataset(destination) as ds, open_dataset(roi_destination) as roi_ds:
+        assert ds[VIDEO].load().rename(expected.name).identical(expected)
+        assert roi_ds[ROI].load().rename(roi.name).identical(roi)
@@ -1,10 +1,27 @@
 """Tests."""
 
 from importlib import import_module
+from re import search
+from subprocess import run
+from sys import executable
 
 import pytest
+from pandas import DataFrame, IndexSlice, Series
+from pytz import timezone
+from xarray import DataArray, Dataset
 
+from boilercv import data, images, types
+from boilercv_pipeline import examples, sets
+from boilercv_pipeline.models import params
 from boilercv_tests import STAGES
+from boilercv_tests.pipeline import NAME, write_source
+
+IMPORT_TIME_BUDGET = 2
+"""Budget for the time it takes to import datasets, in seconds."""
+CORE_IMPORT_TIME_BUDGET = 0.5
+"""Budget for the time it takes to import core modules, in seconds."""
+HEAVY_MODULES = ["matplotlib", "pandas", "PIL", "pytz", "xarray"]
+"""Modules which core modules should only import on first use."""
 
 
 @pytest.mark.slow()
@@ -12,3 +29,77 @@ from boilercv_tests import STAGES
 def test_stages(stage: str):
     """Test that stages can run."""
     import_module(stage).main()
+
+
+def test_import_sets():
+    """Test that datasets import in budget, without loading parameters or sources."""
+    module = "boilercv_pipeline.sets"
+    import_time = get_import_time(
+        module,
+        "from boilercv_pipeline.models.params import get_params",
+        "assert not get_params.cache_info().currsize",
+        f"assert not {module}.get_all_stems.cache_info().currsize",
+    )
+    assert import_time < IMPORT_TIME_BUDGET
+
+
+def test_lazy_pipeline_exports(paths, monkeypatch):
+    """Parameters, source stems, and example paths are found on first access."""
+    assert params.PARAMS is params.get_params()
+    write_source(paths.sources / f"{NAME}.nc")
+    assert sets.ALL_STEMS == [NAME]
+    monkeypatch.setattr(examples, "get_params", sets.get_params)
+    assert examples.EXAMPLE_CONTOURS.parent == paths.examples
+    for module in [params, sets, examples]:
+        with pytest.raises(AttributeError):
+            module.MISSING  # noqa: B018
+
+
+@pytest.mark.parametrize(
+    "module", ["boilercv", "boilercv.images.cv", "boilercv.data.packing"]
+)
+def test_import_core(module: str):
+    """Test that core modules import within budget, without heavy dependencies."""
+    import_time = get_import_time(
+        module,
+        "from sys import modules",
+        f"assert not {{*modules}} & {{*{HEAVY_MODULES}}}",
+    )
+    assert import_time < CORE_IMPORT_TIME_BUDGET
+
+
+def test_lazy_core_exports():
+    """Heavy dependencies of core modules are exported on first access."""
+    assert data.TIMEZONE == timezone("US/Pacific")
+    assert data.islice is IndexSlice
+    assert images.FONT.path == images.get_font().path
+    assert (types.DF, types.DfOrS) == (DataFrame, DataFrame | Series)
+    assert (types.DA, types.DS) == (DataArray, Dataset)
+    assert types.DA_T.__bound__ is DataArray
+    for module in [data, images, types]:
+        with pytest.raises(AttributeError):
+            module.MISSING  # noqa: B018
+
+
+def get_import_time(module: str, *checks: str) -> float:
+    """Get the time it takes to import a module in a fresh interpreter, in seconds.
+
+    Args:
+        module: Module to import.
+        *checks: Statements to run after importing, such as assertions.
+    """
+    result = run(
+        [
+            executable,
+            "-X",
+            "importtime",
+            "-c",
+            "; ".join([f"import {module}", *checks]),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    match = search(rf"\|\s*(\d+) \| {module}\n", result.stderr)
+    assert match
+    return int(match[1]) / 1e6
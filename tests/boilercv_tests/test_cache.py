@@ -0,0 +1,118 @@
+"""Tests for the cache of loaded datasets."""
+
+from os import utime
+
+import pytest
+from numpy import arange
+from pandas import DataFrame
+from xarray import Dataset
+
+from boilercv.data import FRAME, VIDEO
+from boilercv_pipeline import cache as cache_module
+from boilercv_pipeline import sets
+from boilercv_pipeline.cache import DatasetCache, get_key
+from boilercv_tests.pipeline import NAME, write_source
+
+DS = Dataset({VIDEO: (FRAME, arange(10, dtype="uint8"))}, coords={FRAME: arange(10)})
+"""Dataset of ten bytes of video, besides its coordinates."""
+NBYTES = DS.nbytes
+"""Size of the dataset, in bytes."""
+
+
+@pytest.fixture()
+def cache() -> DatasetCache:
+    """Enabled cache with room for two datasets."""
+    return DatasetCache(max_nbytes=2 * NBYTES, enabled=True)
+
+
+def test_cache_hit(cache):
+    """Cached values are served, with slices of frames served from all frames."""
+    cache.put(("a",), DS.copy(deep=True))
+    assert cache.get(("a",)).identical(DS)
+    assert cache.get(("a",), slice(2, 5)).identical(DS.sel({FRAME: slice(2, 5)}))
+    assert cache.get(("b",)) is None
+    info = cache.info()
+    assert (info.hits, info.misses, info.entries) == (2, 1, 1)
+
+
+def test_cache_read_only(cache):
+    """Cached datasets can be assigned to, but not modified in-place."""
+    cached = cache.put(("a",), DS.copy(deep=True))
+    with pytest.raises(ValueError, match="read-only"):
+        cached[VIDEO].values[0] = 1
+    cached[VIDEO] = cached[VIDEO] + 1
+    assert cache.get(("a",)).identical(DS)
+
+
+def test_cache_dataframes_copied_on_write():
+    """Cached dataframes are copied when modified, leaving the cache as it was."""
+    cache = DatasetCache(enabled=True)
+    df = DataFrame({VIDEO: arange(10)})
+    cache.put(("a",), df.copy())
+    cached = cache.get(("a",))
+    cached.loc[0, VIDEO] = -1
+    assert cache.get(("a",)).equals(df)
+
+
+def test_cache_evicts_least_recently_used(cache):
+    """Least-recently used values are evicted to make room for new ones."""
+    for key in ["a", "b"]:
+        cache.put((key,), DS.copy(deep=True))
+    cache.get(("a",))
+    cache.put(("c",), DS.copy(deep=True))
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is not None
+    assert cache.get(("c",)) is not None
+    info = cache.info()
+    assert (info.evictions, info.entries, info.nbytes) == (1, 2, 2 * NBYTES)
+
+
+def test_cache_too_large():
+    """Values larger than the cache aren't cached."""
+    cache = DatasetCache(max_nbytes=NBYTES - 1, enabled=True)
+    cache.put(("a",), DS.copy(deep=True))
+    assert not cache.entries
+
+
+def test_cache_disabled():
+    """Disabled caches neither cache nor serve values."""
+    cache = DatasetCache(enabled=False)
+    ds = DS.copy(deep=True)
+    assert cache.put(("a",), ds) is ds
+    assert not cache.entries
+    assert cache.get(("a",)) is None
+    assert ds[VIDEO].values.flags.writeable
+
+
+def test_cache_disabled_keys(paths, monkeypatch):
+    """Disabled caches don't stat files for keys, e.g. each file in Zarr stores."""
+
+    def get_path_key(_path):
+        raise AssertionError("Files were stat'd for a key of a disabled cache.")
+
+    monkeypatch.setattr(cache_module, "get_path_key", get_path_key)
+    monkeypatch.setattr(sets, "DATASET_CACHE", DatasetCache(enabled=False))
+    write_source(paths.sources / f"{NAME}.nc")
+    assert sets.get_dataset(NAME) is not None
+    assert sets.DATASET_CACHE.get_key(paths.sources) is None
+
+
+@pytest.mark.parametrize("path", ["video.nc", "video.zarr/video/0"])
+def test_get_key_invalidated(tmp_path, path):
+    """Keys change with parameters and files, including files within directories."""
+    (file := tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+    file.write_bytes(b"a")
+    source = tmp_path / path.split("/")[0]
+    key = get_key(source, stage="sources")
+    assert get_key(source, stage="sources") == key
+    assert get_key(source, stage="filled") != key
+    utime(file, ns=(0, 1))
+    assert get_key(source, stage="sources") != key
+
+
+def test_get_key_new_files(tmp_path):
+    """Keys of directories change as files are added to them."""
+    (source := tmp_path / "video.zarr").mkdir()
+    key = get_key(source)
+    (source / "0").write_bytes(b"a")
+    assert get_key(source) != key
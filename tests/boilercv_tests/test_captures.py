@@ -0,0 +1,76 @@
+"""Tests for image and video capturing."""
+
+from threading import active_count
+
+import imageio
+import pytest
+from numpy import array_equal, uint8
+from numpy.random import default_rng
+
+from boilercv.images import scale_bool
+from boilercv_pipeline.captivate import FFMPEG_LOG_LEVEL, FRAMERATE_CONT
+from boilercv_pipeline.captivate.captures import iter_frames_ahead, write_video
+from boilercv_tests.pipeline import BINARIZED
+
+RNG = default_rng(0)
+VIDEO = RNG.integers(0, 255, (12, 40, 64), dtype=uint8)
+"""Random video."""
+
+
+def iter_failing(frames: int):
+    """Yield frames of the video, then fail."""
+    yield from VIDEO[:frames]
+    raise RuntimeError("Failed to read frame.")
+
+
+@pytest.mark.parametrize(
+    ("video", "expected"),
+    [(VIDEO, VIDEO), (iter(VIDEO), VIDEO), (BINARIZED, scale_bool(BINARIZED))],
+    ids=["video", "frames", "binarized"],
+)
+def test_iter_frames_ahead(video, expected):
+    """Frames are converted to viewable frames ahead, in order."""
+    assert array_equal(list(iter_frames_ahead(video, queue_frames=2)), expected)
+
+
+def test_iter_frames_ahead_raises():
+    """Errors while converting frames are raised after the frames before them."""
+    frames = iter_frames_ahead(iter_failing(3))
+    assert array_equal([next(frames) for _ in range(3)], VIDEO[:3])
+    with pytest.raises(RuntimeError, match="Failed to read frame"):
+        next(frames)
+
+
+def test_iter_frames_ahead_stopped():
+    """Stopping early stops converting frames, even if the queue is full."""
+    threads = active_count()
+    frames = iter_frames_ahead(VIDEO, queue_frames=1)
+    next(frames)
+    frames.close()
+    assert active_count() == threads
+
+
+def test_write_video(tmp_path):
+    """Videos are written as by the `imageio` writer by default."""
+    write_video(path := tmp_path / "video.mp4", VIDEO)
+    with imageio.get_writer(
+        uri=(expected := tmp_path / "expected.mp4"),
+        fps=FRAMERATE_CONT,
+        macro_block_size=8,
+        ffmpeg_log_level=FFMPEG_LOG_LEVEL,
+    ) as writer:
+        for image in VIDEO:
+            writer.append_data(image)
+    assert path.read_bytes() == expected.read_bytes()
+
+
+def test_write_video_empty(tmp_path):
+    """Videos without frames can't be written."""
+    with pytest.raises(ValueError, match="without frames"):
+        write_video(tmp_path / "video.mp4", iter([]))
+
+
+def test_write_video_crf(tmp_path):
+    """Constant rate factors are passed to the encoder."""
+    write_video(path := tmp_path / "video.mp4", VIDEO, crf=30)
+    assert b"crf=30.0" in path.read_bytes()
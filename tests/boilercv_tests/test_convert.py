@@ -0,0 +1,63 @@
+"""Tests for converting CINEs to NetCDF."""
+
+import pytest
+from numpy import uint16, zeros
+from xarray import open_dataset
+
+from boilercv_pipeline.manual import convert
+from boilercv_pipeline.models.paths import atomic_write
+from boilercv_pipeline.video import write_dataset
+
+LARGE_FRAME = zeros((1024, 1024), dtype=uint16)
+"""Frame of a large CINE, taking two megabytes."""
+
+
+@pytest.mark.parametrize(
+    ("memory_budget", "expected"),
+    [(1, 1), (4, 1), (12, 3), (1024, 256)],
+    ids=["half-frame", "two-frames", "six-frames", "default"],
+)
+def test_convert_chunk_frames(tmp_path, monkeypatch, memory_budget, expected):
+    """Chunks fit twice in the memory budget, with at least one frame in each."""
+    chunks = []
+
+    def write_dataset(source, destination, chunk_frames):  # noqa: ARG001
+        chunks.append(chunk_frames)
+        destination.touch()
+
+    monkeypatch.setattr(convert, "get_cine_images", lambda *_: iter([LARGE_FRAME]))
+    monkeypatch.setattr(convert, "write_dataset", write_dataset)
+    convert.convert(tmp_path / "source.cine", tmp_path / "source.nc", memory_budget)
+    assert chunks == [expected]
+
+
+def test_convert(tmp_path, cine):
+    """CINEs are converted as by writing their datasets, leaving no temporary files."""
+    convert.convert(cine, destination := tmp_path / "source.nc", memory_budget=1)
+    write_dataset(cine, expected := tmp_path / "expected.nc")
+    with open_dataset(destination) as ds, open_dataset(expected) as expected_ds:
+        assert ds.load().identical(expected_ds.load())
+    assert sorted(tmp_path.iterdir()) == sorted([cine, destination, expected])
+
+
+def test_convert_fails(tmp_path, cine, monkeypatch):
+    """Failed conversions leave neither partial nor temporary files."""
+
+    def write_partial(source, destination, chunk_frames):  # noqa: ARG001
+        destination.write_bytes(b"partial")
+        raise RuntimeError("Failed to read frame.")
+
+    monkeypatch.setattr(convert, "write_dataset", write_partial)
+    with pytest.raises(RuntimeError, match="Failed to read frame"):
+        convert.convert(cine, tmp_path / "source.nc")
+    assert list(tmp_path.iterdir()) == [cine]
+
+
+def test_atomic_write_replaces(tmp_path):
+    """Existing destinations are only replaced once writing finishes."""
+    (destination := tmp_path / "source.nc").write_bytes(b"old")
+    with atomic_write(destination) as temp:
+        temp.write_bytes(b"new")
+        assert destination.read_bytes() == b"old"
+    assert destination.read_bytes() == b"new"
+    assert list(tmp_path.iterdir()) == [destination]
@@ -0,0 +1,170 @@
+"""Tests for datasets."""
+
+import pytest
+from numpy import array_equal, int32, packbits, uint8
+from numpy.random import default_rng
+from xarray import DataArray
+
+from boilercv.data import DIMS, YX_PX, apply_to_img_da, map_images
+from boilercv.data.contours import Contours
+from boilercv.data.packing import PackedVideo, pack, pack_with, unpack
+from boilercv.images.cv import apply_mask, binarize, binarize_and_pack
+from boilercv.types import DA
+
+RNG = default_rng(0)
+VIDEO = DataArray(
+    RNG.integers(0, 255, (8, 40, 60), dtype=uint8),
+    dims=DIMS,
+    name="video",
+    attrs={"long_name": "Video"},
+)
+"""Random grayscale video."""
+MASK = DataArray(RNG.integers(0, 2, (40, 60), dtype=uint8) * 255, dims=YX_PX)
+"""Random mask."""
+
+
+def split(img):
+    """Split an image into two results."""
+    return img // 2, img - img // 2
+
+
+@pytest.mark.parametrize("backend", ["threads", "processes"])
+def test_apply_to_img_da_backends(backend):
+    """Parallel backends give identical results to the serial backend."""
+    kwargs = dict(vectorize=True, name="binarized", kwargs=dict(block_size=5))
+    expected: DA = apply_to_img_da(binarize, VIDEO, **kwargs)
+    result: DA = apply_to_img_da(binarize, VIDEO, **kwargs, backend=backend)
+    assert result.identical(expected)
+
+
+def test_apply_to_img_da_broadcasts():
+    """Images are broadcast across frames, as with `numpy.vectorize`."""
+    expected: DA = apply_to_img_da(apply_mask, VIDEO, MASK, vectorize=True)
+    result: DA = apply_to_img_da(
+        apply_mask, VIDEO, MASK, vectorize=True, backend="threads"
+    )
+    assert result.identical(expected)
+
+
+def test_apply_to_img_da_multiple_returns():
+    """Functions returning multiple images give identical results."""
+    kwargs = dict(returns=2, vectorize=True, name=["a", "b"])
+    expected = apply_to_img_da(split, VIDEO, **kwargs)
+    result = apply_to_img_da(split, VIDEO, **kwargs, backend="threads")
+    assert all(r.identical(e) for r, e in zip(result, expected, strict=True))
+
+
+@pytest.mark.parametrize("backend", ["serial", "threads"])
+def test_apply_to_img_da_empty(backend):
+    """Empty videos give empty results with the type of each image result."""
+    kwargs = dict(vectorize=True, backend=backend)
+    result = apply_to_img_da(binarize, VIDEO[:0], **kwargs, kwargs=dict(block_size=5))
+    assert result.shape == VIDEO[:0].shape
+    assert result.dtype == binarize(VIDEO.values[0], block_size=5).dtype
+    parts = apply_to_img_da(split, VIDEO[:0], **kwargs, returns=2)
+    assert [part.shape for part in parts] == [VIDEO[:0].shape] * 2
+
+
+@pytest.mark.parametrize("frames", [0, len(VIDEO)])
+@pytest.mark.parametrize("backend", ["serial", "threads"])
+def test_apply_to_img_da_no_returns(backend, frames):
+    """Functions returning nothing are applied to each image, even of empty videos."""
+    applied = []
+    apply_to_img_da(
+        applied.append, VIDEO[:frames], returns=None, vectorize=True, backend=backend
+    )
+    assert len(applied) == frames
+
+
+@pytest.mark.parametrize("backend", ["serial", "threads"])
+def test_map_images_backends(backend):
+    """Images are mapped serially or in parallel, in the same order."""
+    result = map_images(
+        binarize, VIDEO.values, backend=backend, kwargs=dict(block_size=5)
+    )
+    assert array_equal(result, [binarize(img, block_size=5) for img in VIDEO.values])
+
+
+def test_pack_with():
+    """Packing with a fused function gives the same layout as packing."""
+    expected = pack(apply_to_img_da(binarize, VIDEO, vectorize=True))
+    assert pack_with(binarize_and_pack, VIDEO).identical(expected)
+
+
+def test_unpack_lazily():
+    """Packed videos chunked along frames are unpacked lazily and identically."""
+    packed = pack(apply_to_img_da(binarize, VIDEO, vectorize=True))
+    lazy = unpack(packed.chunk({"frame": 3}))
+    assert lazy.chunks
+    assert lazy.isel(frame=slice(2, 5)).compute().identical(
+        unpack(packed).isel(frame=slice(2, 5))
+    )
+    assert pack(lazy).compute().identical(packed)
+
+
+BINARIZED = RNG.integers(0, 2, (8, 40, 61), dtype=uint8).astype(bool)
+"""Random binarized video with a width that doesn't fill the last packed byte."""
+PACKED_VIDEO = PackedVideo(packbits(BINARIZED, axis=-1), width=61)
+"""Random packed video."""
+
+
+def test_packed_video_frames():
+    """Frames are decoded from packed bits."""
+    assert all(
+        array_equal(frame, expected)
+        for frame, expected in zip(PACKED_VIDEO, BINARIZED, strict=True)
+    )
+
+
+@pytest.mark.parametrize("chunk_frames", [3, 100])
+def test_packed_video_reductions(chunk_frames):
+    """Reductions over packed bytes match reductions over unpacked frames."""
+    assert array_equal(PACKED_VIDEO.max(), BINARIZED.max(axis=0))
+    assert array_equal(PACKED_VIDEO.select(slice(2, 5)).any(), BINARIZED[2:5].any(0))
+    assert array_equal(PACKED_VIDEO.sum(chunk_frames), BINARIZED.sum(axis=0))
+    assert array_equal(PACKED_VIDEO.counts(chunk_frames), BINARIZED.sum(axis=(1, 2)))
+
+
+def test_contours():
+    """Ragged contours give views of each frame's contours and a compatible table."""
+    frames = [
+        [RNG.integers(0, 40, (n, 2), dtype=int32) for n in lengths]
+        for lengths in [(3, 5), (), (4,), ()]
+    ]
+    contours = Contours.from_frames(frames)
+    assert all(
+        all(array_equal(c, e) for c, e in zip(contours[i], frame, strict=True))
+        and len(contours[i]) == len(frame)
+        for i, frame in enumerate(frames)
+    )
+    assert all(
+        view.base is contours.vertices for frame in contours for view in frame
+    )
+    df = contours.to_df()
+    assert df.index.get_level_values("frame").unique().tolist() == [0, 2]
+    assert array_equal(df.loc[(0, 1)].to_numpy(), frames[0][1])
+    assert Contours.from_dataset(contours.to_dataset()).to_df().equals(df)
+    from_df = Contours.from_df(df.loc[[2, 0]], num_frames=4)
+    assert all(
+        array_equal(getattr(from_df, field), getattr(contours, field))
+        for field in ["vertices", "contour_offsets", "frame_offsets"]
+    )
+
+
+def test_contours_index():
+    """Frames of contours may be indexed from the last, and only if they exist."""
+    frames = [
+        [RNG.integers(0, 40, (n, 2), dtype=int32) for n in lengths]
+        for lengths in [(3, 5), (4,), ()]
+    ]
+    contours = Contours.from_frames(frames)
+    for i in range(-len(frames), len(frames)):
+        expected = frames[i]
+        assert len(contours[i]) == len(expected)
+        assert all(
+            array_equal(c, e) for c, e in zip(contours[i], expected, strict=True)
+        )
+    for i in [len(frames), -len(frames) - 1]:
+        with pytest.raises(IndexError):
+            contours.get_frame_vertices(i)
+    assert len(list(contours)) == len(frames)
@@ -0,0 +1,116 @@
+"""Tests for exporting a preview video of each trial."""
+
+from os import utime
+from types import SimpleNamespace
+
+import pytest
+from numpy import arange, ascontiguousarray, uint8
+from xarray import DataArray
+
+from boilercv.colors import BLUE, RED
+from boilercv.data import FRAME, XPX, YPX
+from boilercv.data.contours import Contours
+from boilercv.images import overlay_video, scale_bool
+from boilercv.images.cv import draw_contours, find_contours
+from boilercv_pipeline.manual import export_previews
+from boilercv_pipeline.manual.export_previews import (
+    CONTOUR_THICKNESS,
+    compose_trial,
+    get_trial_inputs,
+    is_up_to_date,
+)
+from boilercv_tests.pipeline import BINARIZED, NAME, RNG
+
+GRAY = RNG.integers(0, 255, BINARIZED.shape, dtype=uint8)
+"""Random grayscale video."""
+
+
+@pytest.fixture()
+def trial_paths(paths, monkeypatch) -> SimpleNamespace:
+    """Pipeline paths, also for exporting previews."""
+    monkeypatch.setattr(export_previews, "PARAMS", SimpleNamespace(paths=paths))
+    return paths
+
+
+def test_get_trial_inputs(trial_paths):
+    """Trials are previewed over sources, and with contour tables, by default."""
+    assert get_trial_inputs(NAME) == {
+        "gray": trial_paths.sources / f"{NAME}.nc",
+        "filled": trial_paths.filled / f"{NAME}.nc",
+        "contours": trial_paths.contours / f"{NAME}.h5",
+    }
+
+
+def test_get_trial_inputs_stored(trial_paths):
+    """Trials are previewed over large sources, and with stored contours, if found."""
+    (gray := trial_paths.large_sources / f"{NAME}.nc").touch()
+    (contours := trial_paths.contours / f"{NAME}.zarr").mkdir()
+    inputs = get_trial_inputs(NAME)
+    assert (inputs["gray"], inputs["contours"]) == (gray, contours)
+
+
+@pytest.mark.parametrize(
+    ("touched", "preview_frame", "expected"),
+    [
+        ([], True, True),
+        ([], False, True),
+        (["preview.mp4"], True, False),
+        (["preview.png"], True, False),
+        (["preview.png"], False, True),
+        (["input.nc"], True, False),
+        (["input.zarr/0"], True, False),
+    ],
+    ids=[
+        "current",
+        "current-without-frame",
+        "missing-preview",
+        "missing-frame",
+        "missing-frame-not-exported",
+        "stale-file",
+        "stale-directory",
+    ],
+)
+def test_is_up_to_date(tmp_path, touched, preview_frame, expected):
+    """Previews are current if they and their first frames are newer than inputs."""
+    (tmp_path / "input.zarr").mkdir()
+    files = ["input.nc", "input.zarr/0", "preview.mp4", "preview.png"]
+    for mtime, file in enumerate(files):
+        (tmp_path / file).touch()
+        utime(tmp_path / file, ns=(0, mtime))
+    for file in touched:
+        if file.startswith("preview"):
+            (tmp_path / file).unlink()
+        else:
+            utime(tmp_path / file, ns=(0, len(files)))
+    assert (
+        is_up_to_date(
+            tmp_path / "preview.mp4",
+            [tmp_path / "input.nc", tmp_path / "input.zarr"],
+            preview_frame,
+        )
+        == expected
+    )
+
+
+@pytest.mark.parametrize("first_frame", [0, 4])
+def test_compose_trial(first_frame):
+    """Frames are composed over the same frames of the video and their contours."""
+    frames, height, width = GRAY.shape
+    coords = {FRAME: arange(frames), YPX: arange(height), XPX: arange(width)}
+    gray = DataArray(GRAY, coords=coords)
+    filled = DataArray(BINARIZED, coords=coords)[first_frame:]
+    contours = [find_contours(img) for img in BINARIZED.view(uint8)]
+    composed = list(
+        compose_trial(gray, filled, Contours.from_frames(contours), chunk_frames=3)
+    )
+    assert len(composed) == frames - first_frame
+    for frame, image in enumerate(composed, start=first_frame):
+        expected = draw_contours(
+            ascontiguousarray(
+                overlay_video(GRAY[frame], scale_bool(BINARIZED[frame]), color=RED)
+            ),
+            contours[frame],
+            thickness=CONTOUR_THICKNESS,
+            color=BLUE,
+        )
+        assert (image == expected).all()
@@ -0,0 +1,41 @@
+"""Tests for filling contours."""
+
+import pytest
+from dask import config as dask_config
+from numpy import empty, ones, packbits, uint8
+from xarray import Dataset
+
+from boilercv.data import DIMS, ROI, VIDEO, YX_PX
+from boilercv.data.contours import Contours
+from boilercv.images.cv import fill_contours, find_contours
+from boilercv_pipeline.manifest import Manifest
+from boilercv_pipeline.stages.fill import fill_dataset, get_inputs
+from boilercv_tests.pipeline import BINARIZED, NAME, write_source
+
+CONTOURS = Contours.from_frames([find_contours(img) for img in BINARIZED.view(uint8)])
+"""Contours of the test video."""
+
+
+@pytest.mark.parametrize("scheduler", ["synchronous", "threads"])
+def test_fill_dataset(scheduler):
+    """Filling lazily in chunks matches filling the whole video, with any scheduler."""
+    source_ds = Dataset({
+        VIDEO: (DIMS, BINARIZED),
+        ROI: (YX_PX, ones(BINARIZED.shape[1:], dtype=bool)),
+    })
+    expected = packbits(
+        fill_contours(CONTOURS, empty(BINARIZED.shape, dtype=uint8)), axis=-1
+    )
+    ds = fill_dataset(source_ds, CONTOURS, chunk_frames=5, workers=2)
+    with dask_config.set(scheduler=scheduler):
+        assert (ds[VIDEO].values == expected).all()
+
+
+def test_get_inputs_contour_table(paths):
+    """Filled videos are stale if contour tables not yet stored otherwise change."""
+    write_source(paths.sources / f"{NAME}.nc")
+    (table := paths.contours / f"{NAME}.h5").write_bytes(b"a")
+    manifest = Manifest(paths.filled, inputs=get_inputs)
+    manifest.record(NAME)
+    table.write_bytes(b"b")
+    assert manifest.is_stale(NAME)
@@ -0,0 +1,105 @@
+"""Tests for finding contours."""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from numpy import array_equal, full, int32
+from pandas import DataFrame, concat
+from xarray import DataArray
+
+from boilercv.data import DIMS, FRAME, YX_PX
+from boilercv.data.contours import CONTOUR, Contours
+from boilercv_pipeline import sets
+from boilercv_pipeline.stages import find_contours
+from boilercv_pipeline.stages.find_contours import (
+    METHOD,
+    find_all_contours,
+    find_frame_contours,
+    get_all_contours,
+)
+from boilercv_tests.pipeline import BINARIZED, NAME, write_source
+
+VIDEO = BINARIZED.copy()
+VIDEO[3] = False
+"""Binarized video with a frame without contours."""
+EXPECTED = Contours.from_frames([find_frame_contours(img, METHOD) for img in VIDEO])
+"""Contours found in each frame in turn."""
+
+
+def assert_contours_equal(result: Contours, expected: Contours = EXPECTED):
+    """Assert that contours are equal."""
+    assert array_equal(result.vertices, expected.vertices)
+    assert array_equal(result.contour_offsets, expected.contour_offsets)
+    assert array_equal(result.frame_offsets, expected.frame_offsets)
+
+
+@pytest.mark.parametrize("chunk_frames", [1, 5, len(VIDEO)])
+@pytest.mark.parametrize("workers", [1, 4])
+def test_find_all_contours_threads(workers, chunk_frames):
+    """Contours found by threads while chunks load are those found frame by frame."""
+    assert_contours_equal(
+        find_all_contours(VIDEO, METHOD, chunk_frames=chunk_frames, workers=workers)
+    )
+
+
+def test_find_all_contours_lazy():
+    """Contours found in lazily-loaded videos are those found frame by frame."""
+    video = DataArray(VIDEO, dims=DIMS).chunk({FRAME: 5})
+    assert_contours_equal(find_all_contours(video, METHOD, chunk_frames=5, workers=4))
+
+
+def test_find_all_contours_empty():
+    """Videos without contours give contours of each frame with none in them."""
+    contours = find_all_contours(full(VIDEO.shape, False), METHOD, workers=4)
+    assert len(contours) == len(VIDEO)
+    assert all(not contours[frame] for frame in range(len(contours)))
+
+
+def test_get_all_contours():
+    """Contour tables have a row for each vertex of each contour in each frame."""
+    expected = concat([
+        DataFrame(contour.astype(int32), columns=YX_PX).assign(**{
+            FRAME: int32(frame),
+            CONTOUR: int32(num),
+        })
+        for frame, img in enumerate(VIDEO)
+        for num, contour in enumerate(find_frame_contours(img, METHOD))
+    ]).set_index([FRAME, CONTOUR])
+    result = get_all_contours(VIDEO, METHOD, chunk_frames=5, workers=4)
+    assert result.equals(expected)
+
+
+@pytest.fixture()
+def params(paths, monkeypatch) -> SimpleNamespace:
+    """Pipeline parameters, also for finding contours."""
+    params = SimpleNamespace(
+        paths=SimpleNamespace(
+            **vars(paths), stages={"find_contours": Path(find_contours.__file__)}
+        )
+    )
+    monkeypatch.setattr(find_contours, "PARAMS", params)
+    write_source(paths.sources / f"{NAME}.nc")
+    return params
+
+
+def test_main(params):
+    """Contours found by videos in worker processes are those found frame by frame."""
+    find_contours.main(frame_workers=2)
+    # Bubbles are dark in binarized videos, so contours are found in inverted videos
+    expected = [find_frame_contours(img, METHOD) for img in ~BINARIZED]
+    assert_contours_equal(sets.get_contours(NAME), Contours.from_frames(expected))
+
+
+def test_main_stores_tables(params):
+    """Contour tables are stored rather than found again, then removed."""
+    paths = params.paths
+    # Contours in tables which differ from those that would be found
+    table = paths.contours / f"{NAME}.h5"
+    unc_table = paths.uncompressed_contours / table.name
+    for path in [table, unc_table]:
+        EXPECTED.to_df().to_hdf(path, key="contours")
+    find_contours.main(frame_workers=2)
+    assert not table.exists()
+    assert not unc_table.exists()
+    assert_contours_equal(sets.get_contours(NAME))
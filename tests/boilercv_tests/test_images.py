@@ -0,0 +1,94 @@
+"""Tests for image processing."""
+
+import pytest
+from numpy import empty_like, packbits, stack, uint8, zeros_like
+from numpy.random import default_rng
+
+from boilercv.colors import BLUE, RED
+from boilercv.data.contours import Contours
+from boilercv.images import (
+    draw_text,
+    draw_text_video,
+    overlay,
+    overlay_video,
+    scale_bool,
+)
+from boilercv.images.cv import (
+    binarize,
+    binarize_and_pack,
+    binarize_video,
+    draw_contours,
+    draw_frame_contours,
+    fill_contours,
+    find_contours,
+)
+
+VIDEO = default_rng(0).integers(0, 255, (9, 40, 61), dtype=uint8)
+"""Random grayscale video."""
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize(("block_size", "thresh_dist_from_mean"), [(11, 2), (4, -3)])
+def test_binarize_video(workers, block_size, thresh_dist_from_mean):
+    """Binarizing a video matches binarizing each frame."""
+    expected = stack([
+        binarize(img, block_size, thresh_dist_from_mean) for img in VIDEO
+    ])
+    result = binarize_video(VIDEO, block_size, thresh_dist_from_mean, workers=workers)
+    assert result.dtype == expected.dtype
+    assert (result == expected).all()
+
+
+@pytest.mark.parametrize("chunk_frames", [1, 4, 100])
+def test_binarize_and_pack(chunk_frames):
+    """Binarizing and packing in chunks matches packing a binarized video."""
+    expected = packbits(binarize_video(VIDEO), axis=-1)
+    result = binarize_and_pack(VIDEO, chunk_frames=chunk_frames)
+    assert (result == expected).all()
+
+
+@pytest.mark.parametrize(("color", "alpha"), [(RED, 0.3), (BLUE, 0.7)])
+@pytest.mark.parametrize("binarized", [False, True])
+def test_overlay_video(color, alpha, binarized):
+    """Coloring a video given overlays matches coloring each frame."""
+    video = VIDEO > 127 if binarized else VIDEO
+    overlays = scale_bool(VIDEO[::-1] > 100)
+    expected = stack([
+        overlay(img, ov, color, alpha) for img, ov in zip(video, overlays, strict=True)
+    ])
+    assert (overlay_video(video, overlays, color, alpha) == expected).all()
+
+
+def test_draw_text_video():
+    """Drawing text on a video matches drawing text on each frame."""
+    texts = [str(10**frame) for frame in range(len(VIDEO))]
+    for video in (VIDEO, overlay_video(VIDEO, VIDEO[::-1])):
+        expected = stack([
+            draw_text(img, text) for img, text in zip(video, texts, strict=True)
+        ])
+        assert (draw_text_video(video, texts) == expected).all()
+
+
+def test_draw_frame_contours():
+    """Drawing contours from vertices and offsets matches drawing each contour."""
+    contours = Contours.from_frames([
+        find_contours(img) for img in (VIDEO > 200).view(uint8)
+    ])
+    for frame, img in enumerate(VIDEO):
+        expected = draw_contours(zeros_like(img), contours[frame], thickness=2)
+        result = draw_frame_contours(
+            zeros_like(img), *contours.get_frame_vertices(frame), thickness=2
+        )
+        assert (result == expected).all()
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_fill_contours(workers):
+    """Filling ragged contours from a frame matches filling lists of contours."""
+    per_frame = [find_contours(img) for img in (VIDEO > 200).view(uint8)]
+    expected = fill_contours(per_frame[3:], empty_like(VIDEO[3:]), workers)
+    result = fill_contours(
+        Contours.from_frames(per_frame), empty_like(VIDEO[3:]), workers, first_frame=3
+    )
+    assert expected.any()
+    assert (result == expected).all()
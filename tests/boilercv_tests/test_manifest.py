@@ -0,0 +1,93 @@
+"""Tests for manifests of the inputs to processed datasets."""
+
+from os import utime
+from pathlib import Path
+
+import pytest
+
+import boilercv_pipeline.manifest
+from boilercv_pipeline import sets
+from boilercv_pipeline.manifest import MANIFEST, Manifest, get_module_paths
+from boilercv_tests.pipeline import NAME, write_source
+
+
+@pytest.fixture()
+def manifest(tmp_path) -> Manifest:
+    """Manifest of a dataset with an input file, an input directory, and code."""
+    (tmp_path / "store").mkdir()
+    for path, text in {"input": "a", "store/0": "b", "code.py": "c"}.items():
+        (tmp_path / path).write_text(text)
+    manifest = Manifest(
+        tmp_path,
+        inputs=lambda _name: {"file": tmp_path / "input", "dir": tmp_path / "store"},
+        params={"param": 1},
+        code=[tmp_path / "code.py"],
+    )
+    manifest.record(NAME)
+    return manifest
+
+
+def test_manifest_unrecorded(manifest):
+    """Datasets never recorded are stale."""
+    assert manifest.is_stale("other")
+
+
+def test_manifest_recorded(manifest):
+    """Recorded datasets are current, also when the manifest is loaded again."""
+    assert not manifest.is_stale(NAME)
+    assert not Manifest(
+        manifest.directory,
+        inputs=manifest.inputs,
+        params=manifest.params,
+        code=manifest.code,
+    ).is_stale(NAME)
+
+
+@pytest.mark.parametrize("path", ["input", "store/0", "store/1", "code.py"])
+def test_manifest_changed_files(manifest, path):
+    """Datasets are stale if inputs, files in input directories, or code change."""
+    (manifest.directory / path).write_text("changed")
+    assert manifest.is_stale(NAME)
+
+
+def test_manifest_changed_params(manifest):
+    """Datasets are stale if parameters change."""
+    manifest.params = {"param": 2}
+    assert manifest.is_stale(NAME)
+
+
+def test_manifest_touched(manifest):
+    """Datasets are current if inputs are modified without changing their contents."""
+    utime(manifest.directory / "input", ns=(0, 1))
+    assert not manifest.is_stale(NAME)
+    manifest.record(NAME)
+    assert manifest.records[NAME]["inputs"]["file"]["mtime"] == 1
+
+
+def test_manifest_seed(manifest):
+    """Seeding records datasets never recorded, keeping those already recorded."""
+    (manifest.directory / "input").write_text("changed")
+    manifest.seed([NAME, "other"])
+    assert manifest.is_stale(NAME)
+    assert not manifest.is_stale("other")
+
+
+def test_get_unprocessed_destinations(paths):
+    """Existing datasets are seeded, then reprocessed only if their inputs change."""
+    write_source(source := paths.sources / f"{NAME}.nc")
+    destination = paths.filled / f"{NAME}.nc"
+    destination.touch()
+    manifest = Manifest(paths.filled, inputs=sets.get_source_inputs)
+    assert not sets.get_unprocessed_destinations(paths.filled, manifest=manifest)
+    assert (paths.filled / MANIFEST).exists()
+    source.write_bytes(source.read_bytes() + b"\0")
+    assert sets.get_unprocessed_destinations(paths.filled, manifest=manifest) == {
+        NAME: destination
+    }
+
+
+def test_get_module_paths():
+    """Source files of modules are found without importing them."""
+    assert get_module_paths("boilercv_pipeline.manifest") == [
+        Path(boilercv_pipeline.manifest.__file__)
+    ]
@@ -0,0 +1,53 @@
+"""Tests for previews of each video."""
+
+import pytest
+from numpy import uint8
+from numpy.random import default_rng
+from xarray import open_dataset
+
+from boilercv.data import XPX, YPX
+from boilercv_pipeline import sets
+from boilercv_pipeline.stages.preview import new_videos_to_preview
+
+RNG = default_rng(0)
+PREVIEWS = {
+    "a": RNG.integers(0, 255, (20, 30), dtype=uint8),
+    "b": RNG.integers(0, 255, (16, 24), dtype=uint8),
+    "c": RNG.integers(0, 255, (18, 30), dtype=uint8),
+    "d": RNG.integers(0, 255, (24, 20), dtype=uint8),
+}
+"""Previews of videos of different sizes."""
+
+
+def add_sources(paths, *names: str):
+    """Add sources of videos to preview."""
+    for name in names:
+        (paths.sources / f"{name}.nc").touch()
+    sets.get_all_stems.cache_clear()
+
+
+def preview(destination, reprocess: bool = False):
+    """Preview new videos."""
+    with new_videos_to_preview(destination, reprocess) as videos_to_preview:
+        for name in videos_to_preview:
+            videos_to_preview[name] = PREVIEWS[name]
+
+
+@pytest.mark.parametrize(
+    ("new", "appended"), [(["c"], True), (["c", "d"], False)], ids=["fits", "grows"]
+)
+def test_new_videos_to_preview(paths, new, appended):
+    """Previews appended to a canvas, or rebuilt on a larger one, match a full build."""
+    destination = paths.media / "preview.nc"
+    add_sources(paths, "a", "b")
+    preview(destination)
+    with open_dataset(destination) as ds:
+        first = ds.load()
+    add_sources(paths, *new)
+    preview(destination)
+    preview(expected := paths.media / "expected.nc", reprocess=True)
+    with open_dataset(destination) as ds, open_dataset(expected) as expected_ds:
+        assert ds.load().identical(expected_ds.load())
+        # Previews are only appended if they fit on the canvas of existing previews
+        canvas = (ds.sizes[YPX], ds.sizes[XPX])
+        assert (canvas == (first.sizes[YPX], first.sizes[XPX])) == appended
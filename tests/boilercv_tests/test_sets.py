@@ -0,0 +1,43 @@
+"""Tests for pipeline datasets."""
+
+from pathlib import Path
+
+import pytest
+
+from boilercv.data import VIDEO
+from boilercv_pipeline import sets
+from boilercv_tests.pipeline import BINARIZED, NAME, write_source
+
+
+def test_get_dataset_lazy_split_frames(paths):
+    """Sources stored in chunks that split frames are read lazily with whole frames."""
+    write_source(paths.sources / f"{NAME}.nc", {"zlib": True, "chunksizes": (5, 16, 3)})
+    lazy = sets.get_dataset(NAME, lazy=True)[VIDEO]
+    assert all(len(chunks) == 1 for chunks in lazy.chunks[1:])
+    assert (lazy.values == BINARIZED).all()
+
+
+def test_get_contours_source(paths):
+    """Contours are found where stored, falling back to contour tables."""
+    assert sets.get_contours_source(NAME) == paths.contours / f"{NAME}.h5"
+    (store := paths.contours / f"{NAME}.nc").touch()
+    assert sets.get_contours_source(NAME) == store
+
+
+def test_get_cine_name():
+    """CINEs named by their time give names of their time, and others of their stem."""
+    assert sets.get_cine_name(Path("Y20220106H152034.cine")) == NAME
+    assert sets.get_cine_name(Path("other.cine")) == "other"
+
+
+@pytest.mark.parametrize("stem", ["Y20220106H152034", NAME, "other"])
+def test_find_cine(paths, stem):
+    """CINEs of videos are found by the names of the videos converted from them."""
+    (cine := paths.cines / f"{stem}.cine").touch()
+    assert sets.find_cine(sets.get_cine_name(cine)) == cine
+
+
+def test_find_cine_missing(paths):
+    """Videos without CINEs or large sources have no first large source frame."""
+    assert sets.find_cine(NAME) is None
+    assert sets.get_first_frame(NAME, "large_sources") is None
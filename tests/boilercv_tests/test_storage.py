@@ -0,0 +1,140 @@
+"""Tests for storage of pipeline datasets."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import get_args
+
+import pytest
+from numpy import arange, uint8
+from numpy.random import default_rng
+from xarray import Dataset, open_dataset, zeros_like
+
+from boilercv.data import FRAME, VIDEO, XPX, YPX
+from boilercv_pipeline.storage import (
+    ZARR,
+    append_store,
+    can_append,
+    decodes_slowly,
+    get_codec,
+    init_store,
+    memmap_video,
+    read_frame,
+    write_frames,
+    write_store,
+)
+from boilercv_pipeline.types import Codec
+
+RNG = default_rng(0)
+DS = Dataset(
+    {VIDEO: ((FRAME, YPX, XPX), RNG.integers(0, 255, (12, 40, 60), dtype=uint8))},
+    coords={FRAME: arange(12)},
+)
+"""Dataset with a random, incompressible video."""
+
+
+@pytest.mark.parametrize("ext", [".nc", ZARR])
+@pytest.mark.parametrize("codec", get_args(Codec))
+def test_write_store_round_trip(tmp_path, codec, ext):
+    """Videos round-trip with each codec, even if incompressible."""
+    destination = tmp_path / f"video{ext}"
+    write_store(DS, destination, codec=codec, chunk_frames=5)
+    with open_dataset(destination) as ds:
+        assert ds.load().identical(DS)
+
+
+@pytest.mark.parametrize("ext", [".nc", ZARR])
+@pytest.mark.parametrize("codec", get_args(Codec))
+def test_get_codec(tmp_path, codec, ext):
+    """Codecs of written videos are found when they are read."""
+    write_store(zeros_like(DS), destination := tmp_path / f"video{ext}", codec=codec)
+    with open_dataset(destination) as ds:
+        assert get_codec(ds[VIDEO]) == codec
+
+
+def test_default_codec_decodes_fast(tmp_path):
+    """Videos written with the default codec don't need uncompressed copies."""
+    write_store(DS, destination := tmp_path / "video.nc")
+    with open_dataset(destination) as ds:
+        assert not decodes_slowly(ds[VIDEO])
+
+
+@pytest.mark.parametrize("codec", ["blosc_lz4", "blosc_zstd"])
+def test_write_store_lazy_blosc(tmp_path, codec):
+    """Lazy videos are compressed with Zstandard instead of being checked for Blosc."""
+    write_store(DS.chunk({FRAME: 5}), destination := tmp_path / "video.nc", codec)
+    with open_dataset(destination) as ds:
+        assert get_codec(ds[VIDEO]) == "zstd"
+        assert ds.load().identical(DS)
+
+
+def test_memmap_video(tmp_path):
+    """Uncompressed, contiguous videos are memory-mapped as they are read normally."""
+    destination = tmp_path / "video.nc"
+    DS.to_netcdf(destination)
+    video = memmap_video(destination)
+    assert video is not None
+    with open_dataset(destination) as ds:
+        assert (video == ds[VIDEO].values).all()
+
+
+@pytest.mark.parametrize("ext", [".nc", ZARR])
+def test_memmap_video_compressed(tmp_path, ext):
+    """Compressed videos and Zarr stores aren't memory-mapped."""
+    destination = tmp_path / f"video{ext}"
+    write_store(DS, destination, codec="zlib")
+    assert memmap_video(destination) is None
+
+
+@pytest.mark.parametrize("frame", [0, 7, -1])
+@pytest.mark.parametrize("codec", [None, *get_args(Codec)])
+@pytest.mark.parametrize("ext", [".nc", ZARR])
+def test_read_frame(tmp_path, ext, codec, frame):
+    """Frames are read just as they are from whole videos, however they are stored."""
+    destination = tmp_path / f"video{ext}"
+    if codec:
+        write_store(DS, destination, codec=codec, chunk_frames=5)
+    elif ext == ZARR:
+        DS.to_zarr(destination)
+    else:
+        DS.to_netcdf(destination)
+    with open_dataset(destination) as ds:
+        expected = ds[VIDEO].values[frame]
+    assert (read_frame(destination, frame) == expected).all()
+
+
+@pytest.mark.parametrize("codec", ["none", "zlib", "zstd"])
+@pytest.mark.parametrize("ext", [".nc", ZARR])
+def test_append_store(tmp_path, codec, ext):
+    """Appending to a store gives the same dataset as writing it all at once."""
+    destination = tmp_path / f"appended{ext}"
+    write_store(DS.isel({FRAME: slice(5)}), destination, codec, unlimited_dims=[FRAME])
+    assert can_append(destination, FRAME)
+    append_store(DS.isel({FRAME: slice(5, None)}), destination, FRAME)
+    write_store(DS, expected := tmp_path / f"expected{ext}", codec)
+    with open_dataset(destination) as ds, open_dataset(expected) as expected_ds:
+        assert ds.load().identical(expected_ds.load())
+
+
+@pytest.mark.parametrize(
+    ("codec", "unlimited_dims"),
+    [("zlib", []), ("blosc_lz4", [FRAME]), ("blosc_zstd", [FRAME])],
+)
+def test_cant_append(tmp_path, codec, unlimited_dims):
+    """NetCDF files aren't appended to along limited dimensions, or if Blosc is used."""
+    destination = tmp_path / "video.nc"
+    write_store(zeros_like(DS), destination, codec, unlimited_dims=unlimited_dims)
+    assert not can_append(destination, FRAME)
+
+
+def test_write_frames(tmp_path):
+    """Frames written concurrently in chunks give the same store as writing them all."""
+    destination = tmp_path / f"video{ZARR}"
+    init_store(zeros_like(DS.chunk({FRAME: 4})), destination, "zstd", chunk_frames=4)
+    with ThreadPoolExecutor() as executor:
+        for future in [
+            executor.submit(write_frames, DS.isel({FRAME: frame}), destination, frame)
+            for frame in [slice(0, 4), slice(4, 8), slice(8, 12)]
+        ]:
+            future.result()
+    write_store(DS, expected := tmp_path / f"expected{ZARR}", "zstd", chunk_frames=4)
+    with open_dataset(destination) as ds, open_dataset(expected) as expected_ds:
+        assert ds.load().identical(expected_ds.load())
@@ -0,0 +1,55 @@
+"""Tests for video datasets."""
+
+import pytest
+from numpy import array_equal
+from xarray import open_dataset
+
+from boilercv.data import FRAME, VIDEO
+from boilercv_pipeline.video import (
+    get_chunked_cine_images,
+    prepare_dataset,
+    read_cine_chunk,
+    write_dataset,
+)
+from boilercv_tests.pipeline import CINE
+
+
+@pytest.mark.parametrize("chunk_frames", [1, 5, 100])
+@pytest.mark.parametrize(
+    ("num_frames", "start_frame"), [(None, 0), (7, 3)], ids=["all", "partial"]
+)
+def test_write_dataset(tmp_path, cine, num_frames, start_frame, chunk_frames):
+    """Chunked datasets are written as datasets prepared in memory."""
+    write_dataset(
+        cine, path := tmp_path / "video.nc", num_frames, start_frame, chunk_frames
+    )
+    prepare_dataset(cine, num_frames, start_frame).to_netcdf(
+        expected := tmp_path / "expected.nc"
+    )
+    with open_dataset(path) as ds, open_dataset(expected) as expected_ds:
+        assert ds[VIDEO].encoding["chunksizes"][0] == min(chunk_frames, ds.sizes[FRAME])
+        assert ds.load().identical(expected_ds.load())
+
+
+@pytest.mark.parametrize(
+    ("chunk_frames", "expected"), [(1, (1,) * 7), (5, (5, 2)), (100, (7,))]
+)
+def test_get_chunked_cine_images(cine, chunk_frames, expected):
+    """Images are read lazily in chunks, starting from any frame."""
+    images = get_chunked_cine_images(cine, 7, 3, chunk_frames)
+    assert images.chunks[0] == expected
+    assert array_equal(images.compute(), CINE[3:10])
+
+
+def test_read_cine_chunk(cine):
+    """Chunks of frames are read into arrays of the shape and type of images."""
+    chunk = read_cine_chunk(cine, 3, 4, CINE.shape[1:], CINE.dtype)
+    assert chunk.dtype == CINE.dtype
+    assert array_equal(chunk, CINE[3:7])
+
+
+def test_prepare_dataset_lazy(cine):
+    """Lazily prepared datasets are prepared as in memory."""
+    ds = prepare_dataset(cine, 7, 3, chunk_frames=5)
+    assert ds[VIDEO].chunks
+    assert ds.compute().identical(prepare_dataset(cine, 7, 3))